@@ -0,0 +1,283 @@
+import os
+import sys
+import threading
+import time
+
+import pygame
+from render_cache import to_display_format
+
+
+class SpriteRegistry:
+    """Decodes each sprite image once and shares scaled copies and masks.
+
+    Images are converted to the display format on first use. Scaled images and
+    their collision masks are cached per (name, size), so every enemy spawned
+    at the same scale reuses the same surface and mask.
+    """
+
+    def __init__(self, directory="images"):
+        self.directory = directory
+        self.images = {}
+        self.scaled = {}
+
+    def load(self, name):
+        """Return the decoded, display-format image for name"""
+        image = self.images.get(name)
+        if image is None:
+            image = to_display_format(pygame.image.load(os.path.join(self.directory, name)), alpha=True)
+            self.images[name] = image
+        return image
+
+    def get(self, name, scale):
+        """Return (image, mask) for name scaled by scale"""
+        image = self.load(name)
+        size = (int(image.get_width() * scale), int(image.get_height() * scale))
+        key = (name, size)
+        sprite = self.scaled.get(key)
+        if sprite is None:
+            scaled_image = pygame.transform.scale(image, size)
+            sprite = (scaled_image, pygame.mask.from_surface(scaled_image))
+            self.scaled[key] = sprite
+        return sprite
+
+
+class SilentSound:
+    """Stands in for a sound that couldn't be loaded"""
+
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+    def get_length(self):
+        return 0.0
+
+
+class PcmCache:
+    """Decoded sound effects kept on disk as raw samples in the mixer's format.
+
+    The first launch decodes and resamples each file as usual and writes the
+    mixer's copy of the samples next to it. Later launches read those bytes
+    straight into a Sound. A cache file is named after the source file's size
+    and modification time and the mixer format, so editing a sound or opening
+    the mixer differently decodes it afresh, and replaces the old copy.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def cache_path(self, path):
+        if pygame.mixer.get_init() is None:
+            raise pygame.error("mixer not initialized")
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        stat = os.stat(path)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = f"{stem}-{stat.st_size}-{stat.st_mtime_ns}-{frequency}-{sample_format}-{channels}.pcm"
+        return os.path.join(self.directory, name)
+
+    def load(self, path):
+        """Return (sound, True) from the cache, or (sound, False) after decoding and caching it"""
+        cache_path = self.cache_path(path)
+        try:
+            with open(cache_path, "rb") as f:
+                return pygame.mixer.Sound(buffer=f.read()), True
+        except FileNotFoundError:
+            pass
+
+        sound = pygame.mixer.Sound(path)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary file first so a crash never leaves half a sound behind
+            with open(cache_path + ".tmp", "wb") as f:
+                f.write(sound.get_raw())
+            os.replace(cache_path + ".tmp", cache_path)
+            self.remove_stale(path, cache_path)
+        except OSError as e:
+            print(f"Could not cache {path}: {e}", file=sys.stderr)
+        return sound, False
+
+    def remove_stale(self, path, cache_path):
+        """Delete the other cached copies of a sound, left by older versions of it"""
+        # Names continue with the file size after the stem, which tells
+        # "jet-<size>-..." apart from another sound called "jet-engine"
+        prefix = os.path.splitext(os.path.basename(path))[0] + "-"
+        current = os.path.basename(cache_path)
+        for name in os.listdir(self.directory):
+            if (name != current and name.endswith(".pcm") and name.startswith(prefix)
+                    and name[len(prefix):len(prefix) + 1].isdigit()):
+                os.remove(os.path.join(self.directory, name))
+
+
+class StreamedTrack:
+    """A long sound played from disk through pygame.mixer.music instead of memory.
+
+    Only one track streams at a time; playing another replaces it.
+    """
+
+    def __init__(self, path, volume=1.0):
+        self.path = path
+        self.volume = volume
+
+    def play(self, loops=0):
+        pygame.mixer.music.load(self.path)
+        pygame.mixer.music.set_volume(self.volume)
+        pygame.mixer.music.play(loops)
+
+    def stop(self):
+        pygame.mixer.music.stop()
+
+    def set_volume(self, volume):
+        self.volume = volume
+        pygame.mixer.music.set_volume(volume)
+
+
+def load_sound(entry, cache=None):
+    """Load a short effect fully into memory, through the PCM cache if one is given"""
+    if cache is not None:
+        sound, cached = cache.load(entry["path"])
+        entry["source"] = "PCM cache" if cached else "decoded, now cached"
+    else:
+        sound = pygame.mixer.Sound(entry["path"])
+    sound.set_volume(entry.get("volume", 1.0))
+    return sound
+
+
+def load_stream(entry):
+    """Check a long track can be streamed; it is only read while it plays.
+
+    Files the music streamer can't read, such as some WAV encodings, are
+    decoded into memory like an effect instead.
+    """
+    os.stat(entry["path"])
+    try:
+        pygame.mixer.music.load(entry["path"])
+    except pygame.error:
+        sound = load_sound(entry)
+        entry["source"] = "decoded, can't be streamed"
+        return sound
+    entry["source"] = "streamed from disk"
+    return StreamedTrack(entry["path"], entry.get("volume", 1.0))
+
+
+def memory_footprint(asset):
+    """Bytes of memory an asset holds on to, as far as it can be told"""
+    if isinstance(asset, pygame.Surface):
+        return asset.get_bytesize() * asset.get_width() * asset.get_height()
+    if isinstance(asset, pygame.mixer.Sound):
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        return round(asset.get_length() * frequency) * channels * (abs(sample_format) // 8)
+    return 0
+
+
+class AssetLoader:
+    """Loads the assets listed in a manifest on a background thread.
+
+    Each manifest entry is a dict with the asset's name, its kind, and any
+    options its kind's loader needs. Entries marked essential are loaded
+    first, then the rest follow. get() loads anything not ready yet on the
+    spot. An asset that fails to load is replaced by its kind's fallback and
+    reported, instead of stopping the game.
+    """
+
+    def __init__(self, manifest, loaders, fallbacks=None):
+        # Essential assets go first, otherwise in manifest order
+        self.manifest = sorted(manifest, key=lambda entry: not entry.get("essential", False))
+        self.entries = {entry["name"]: entry for entry in manifest}
+        self.loaders = loaders
+        self.fallbacks = fallbacks or {}
+        self.assets = {}
+        self.timings = {}
+        self.sizes = {}
+        self.failures = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.load_all, name="asset-loader", daemon=True)
+        self.thread.start()
+
+    def load_all(self):
+        for entry in self.manifest:
+            self.load(entry["name"])
+
+    def load(self, name):
+        with self.lock:
+            if name in self.assets:
+                return self.assets[name]
+
+            entry = self.entries[name]
+            start = time.perf_counter()
+            try:
+                asset = self.loaders[entry["kind"]](entry)
+            except (pygame.error, OSError) as e:
+                fallback = self.fallbacks.get(entry["kind"])
+                asset = fallback() if fallback is not None else None
+                self.failures[name] = str(e)
+                print(f"Could not load {entry.get('path', name)}: {e}; using a fallback", file=sys.stderr)
+            self.timings[name] = time.perf_counter() - start
+            self.sizes[name] = memory_footprint(asset)
+            self.assets[name] = asset
+            return asset
+
+    def get(self, name):
+        asset = self.assets.get(name)
+        if asset is None and name not in self.assets:
+            asset = self.load(name)
+        return asset
+
+    def essential_progress(self):
+        """Fraction of the essential assets loaded so far"""
+        essential = [entry["name"] for entry in self.manifest if entry.get("essential", False)]
+        if not essential:
+            return 1.0
+        return sum(name in self.assets for name in essential) / len(essential)
+
+    def wait(self):
+        """Block until every asset is loaded"""
+        if self.thread is not None:
+            self.thread.join()
+
+    def report(self):
+        """Load time and memory footprint of every asset loaded so far"""
+        lines = [f"{'asset':<28}{'kind':<8}{'ms':>8}{'KiB':>9}  source"]
+        for name, seconds in self.timings.items():
+            entry = self.entries[name]
+            # Loaders may note where an asset came from in its entry
+            source = "failed, using fallback" if name in self.failures else entry.get("source", "decoded")
+            lines.append(f"{name:<28}{entry['kind']:<8}{seconds * 1000:8.1f}{self.sizes[name] / 1024:9.1f}  {source}")
+        return lines
+
+
+class StartupProfile:
+    """Wall-clock breakdown of everything that happens before the first frame"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.steps = []
+        self.frames = {}
+
+    def timed(self, name, action):
+        """Run action() and record how long it took"""
+        start = time.perf_counter()
+        try:
+            return action()
+        finally:
+            self.steps.append((name, time.perf_counter() - start))
+
+    def frame_shown(self, label):
+        """Record the first time a frame of this kind reached the screen"""
+        self.frames.setdefault(label, time.perf_counter() - self.start)
+
+    def report(self, loader=None):
+        lines = [f"{'startup step':<40}{'ms':>9}"]
+        for name, seconds in self.steps:
+            lines.append(f"{name:<40}{seconds * 1000:9.1f}")
+        for label, seconds in self.frames.items():
+            lines.append(f"{label + ' (since start)':<40}{seconds * 1000:9.1f}")
+        if loader is not None:
+            lines += ["", "assets, loaded in the background:"] + loader.report()
+        return lines
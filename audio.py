@@ -0,0 +1,168 @@
+import time
+
+import pygame
+
+from assets import SilentSound, StreamedTrack
+
+
+class Voice:
+    """How many copies of a sound may play at once, and how much it matters"""
+
+    def __init__(self, limit=1, priority=0):
+        self.limit = limit
+        self.priority = priority
+        self.playing = []  # (channel, started) pairs, oldest first
+        self.plays = 0
+        self.stolen = 0
+        self.dropped = 0
+
+
+class AudioManager:
+    """Plays the game's sounds on a fixed set of mixer channels.
+
+    The first channels are reserved for the looping sounds named in loops,
+    which start once and keep playing until stopped. A looping track that
+    streams from disk plays through pygame.mixer.music instead; one that
+    ends up in memory, because it couldn't be streamed, reserves the next
+    channel when it first plays. One-shot effects share the remaining
+    channels. Each sound has a voice limit: past it, its own oldest voice is
+    restarted instead of taking another channel. When every channel is
+    busy, the oldest voice of the lowest priority sound gives way to a sound
+    of the same or higher priority; otherwise the new sound is dropped.
+    lookup(name) returns the sound to play, or None. Until open() finds the
+    mixer started, every sound is silent.
+    """
+
+    def __init__(self, lookup, channels=16, loops=("engine",)):
+        self.lookup = lookup
+        self.channel_count = channels
+        self.loops = loops
+        self.loop_channels = {}
+        self.looping = {}
+        self.voices = {}
+        self.enabled = False
+
+        # Channel utilisation, sampled once a frame while a report is wanted
+        self.sampling = False
+        self.samples = 0
+        self.busy_total = 0
+        self.busy_peak = 0
+
+    def open(self):
+        """Take over the mixer's channels, once it has been started"""
+        if pygame.mixer.get_init() is None:
+            return
+        pygame.mixer.set_num_channels(self.channel_count)
+        pygame.mixer.set_reserved(len(self.loops))
+        self.loop_channels = {name: pygame.mixer.Channel(i) for i, name in enumerate(self.loops)}
+        self.enabled = True
+
+    def configure(self, name, limit=1, priority=0):
+        self.voices[name] = Voice(limit, priority)
+
+    def sound(self, name):
+        sound = self.lookup(name)
+        # Fallbacks for sounds that failed to load have nothing to play
+        return None if isinstance(sound, SilentSound) else sound
+
+    def loop(self, name):
+        """Start a looping sound, streamed or on its reserved channel, unless it is already playing"""
+        # Called every frame, so this must not touch the mixer once started
+        if name in self.looping or not self.enabled:
+            return
+        sound = self.sound(name)
+        player = None
+        if isinstance(sound, StreamedTrack):
+            sound.play(loops=-1)
+            player = sound
+        elif sound is not None:
+            player = self.loop_channels.get(name) or self.reserve(name)
+            player.play(sound, loops=-1)
+        # A sound that failed to load stays silent rather than being retried
+        self.looping[name] = player
+
+    def reserve(self, name):
+        """Reserve one more channel for a looping sound held in memory, such as a track that can't stream"""
+        index = len(self.loop_channels)
+        pygame.mixer.set_reserved(index + 1)
+        channel = self.loop_channels[name] = pygame.mixer.Channel(index)
+        return channel
+
+    def stop_loop(self, name):
+        channel = self.looping.pop(name, None)
+        if channel is not None:
+            channel.stop()
+
+    def play(self, name):
+        """Play a one-shot sound within its voice limit"""
+        if not self.enabled:
+            return
+        sound = self.sound(name)
+        if sound is None:
+            return
+        voice = self.voices.get(name)
+        if voice is None:
+            voice = self.voices[name] = Voice()
+        voice.plays += 1
+
+        self.forget_finished(voice, sound)
+
+        if len(voice.playing) >= voice.limit:
+            channel, _ = voice.playing.pop(0)
+            voice.stolen += 1
+        else:
+            channel = pygame.mixer.find_channel() or self.steal_channel(voice.priority)
+            if channel is None:
+                voice.dropped += 1
+                return
+        channel.play(sound)
+        voice.playing.append((channel, time.perf_counter()))
+
+    def forget_finished(self, voice, sound):
+        """Forget voices that finished or were taken over by another sound"""
+        voice.playing = [(channel, started) for channel, started in voice.playing
+                         if channel.get_busy() and channel.get_sound() is sound]
+
+    def steal_channel(self, priority):
+        """Stop the oldest voice of the least important sound at or below priority"""
+        victim = None
+        for name, voice in self.voices.items():
+            if voice.priority > priority:
+                continue
+            # A channel since taken over, say by a loop, is not this voice's to give
+            self.forget_finished(voice, self.sound(name))
+            if not voice.playing:
+                continue
+            channel, started = voice.playing[0]
+            if victim is None or (voice.priority, started) < (victim.priority, victim.playing[0][1]):
+                victim = voice
+        if victim is None:
+            return None
+        channel, _ = victim.playing.pop(0)
+        victim.stolen += 1
+        channel.stop()
+        return channel
+
+    def start_report(self):
+        self.sampling = self.enabled
+
+    def sample(self):
+        """Count the busy channels this frame"""
+        if not self.sampling:
+            return
+        busy = sum(pygame.mixer.Channel(i).get_busy() for i in range(self.channel_count))
+        self.samples += 1
+        self.busy_total += busy
+        self.busy_peak = max(self.busy_peak, busy)
+
+    def report(self):
+        """Channel utilisation and per-sound play counts"""
+        if not self.enabled:
+            return ["audio disabled (no mixer)"]
+        mean = self.busy_total / self.samples if self.samples else 0.0
+        lines = [f"channels: {self.channel_count} ({len(self.loop_channels)} reserved), "
+                 f"mean busy {mean:.1f} ({mean / self.channel_count:.0%}), peak {self.busy_peak}",
+                 f"{'sound':<12}{'limit':>6}{'plays':>8}{'stolen':>8}{'dropped':>8}"]
+        for name, voice in self.voices.items():
+            lines.append(f"{name:<12}{voice.limit:>6}{voice.plays:>8}{voice.stolen:>8}{voice.dropped:>8}")
+        return lines
@@ -0,0 +1,42 @@
+"""Scripted pilots for headless sessions.
+
+A policy takes a GameSession and returns the frame's input as
+(moves_up, moves_down, speed_up, speed_down).
+"""
+
+
+def cruise(session):
+    """Fly straight ahead at full speed"""
+    return False, False, True, False
+
+
+def weave(session):
+    """Fly at full speed while sweeping up and down"""
+    going_up = (session.frame // 90) % 2 == 0
+    return going_up, not going_up, True, False
+
+
+def dodge(session):
+    """Fly at full speed, steering away from the nearest enemy ahead in the player's lane"""
+    player = session.player_flight
+    ahead = session.enemy_flights.overlapping(player.world_x - player.rect.width, player.world_x + 400)
+
+    for enemy in ahead:
+        gap = enemy.rect.centery - player.rect.centery
+        if abs(gap) < (enemy.rect.height + player.rect.height) // 2 + 20:
+            # Climb over enemies below, dive under enemies above, unless pinned at an edge
+            go_up = gap > 0
+            if go_up and player.rect.top <= 0:
+                go_up = False
+            elif not go_up and player.rect.bottom >= session.screen_size[1]:
+                go_up = True
+            return go_up, not go_up, True, False
+
+    return False, False, True, False
+
+
+POLICIES = {
+    "cruise": cruise,
+    "weave": weave,
+    "dodge": dodge
+}
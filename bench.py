@@ -0,0 +1,416 @@
+"""Headless benchmarks for the game's rendering, collision and spawning hot paths.
+
+Both renderers (pilots.py and pilots1.py) are measured side by side:
+
+    python bench.py                         # run everything and print the results
+    python bench.py -k background           # only benchmarks whose name contains "background"
+    python bench.py --save-baseline         # store the results in bench_baseline.json
+    python bench.py --compare               # exit with 1 if anything regressed past --threshold
+
+Every benchmark is timed call by call for the mean and p95. A separate,
+shorter pass counts the surfaces created and the peak Python heap growth per
+call, so that tracing does not skew the timings.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+import pygame
+
+import pilots
+import pilots1
+
+SEASONS = ("sunny", "rainy", "night")
+PLACES = ("farmland", "city", "hill_country", "seaside")
+
+
+class CountingSurface(pygame.Surface):
+    """pygame.Surface that counts how many are built, swapped in for the allocation pass"""
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        CountingSurface.created += 1
+        super().__init__(*args, **kwargs)
+
+
+class Benchmark:
+    """A named benchmark built lazily by setup().
+
+    setup() returns the function called once per iteration, or a pair of it
+    and an untimed function run before each call.
+    """
+
+    def __init__(self, name, setup):
+        self.name = name
+        self.setup = setup
+        self.call = None
+        self.before = None
+
+    def run(self, calls):
+        samples = []
+        for _ in range(calls):
+            if self.before is not None:
+                self.before()
+            start = time.perf_counter()
+            self.call()
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    def build(self):
+        built = self.setup()
+        self.call, self.before = built if isinstance(built, tuple) else (built, None)
+
+    def time(self, calls, warmup=5):
+        """Mean and p95 of calls timed one by one, in microseconds"""
+        self.build()
+        self.run(warmup)
+        samples = sorted(self.run(calls))
+        self.call = self.before = None
+        return {
+            "mean_us": statistics.fmean(samples) * 1e6,
+            "p95_us": samples[round(0.95 * (len(samples) - 1))] * 1e6
+        }
+
+    def allocations(self, calls, warmup=5):
+        """Surfaces created and peak heap growth per call; tracemalloc must be running"""
+        self.build()
+        self.run(warmup)
+        real_surface = pygame.Surface
+        pygame.Surface = CountingSurface
+        CountingSurface.created = 0
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        try:
+            self.run(calls)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            pygame.Surface = real_surface
+        self.call = self.before = None
+        return {
+            "surfaces": CountingSurface.created / calls,
+            "peak_kib": (peak - before) / 1024
+        }
+
+
+# Background rendering
+
+def pilots_background(season, place, scale=1.0):
+    """Draw an environment at a render scale, including the stretch to the screen"""
+    bg = pilots.BackgroundManager()
+    bg.current_season, bg.current_place = season, place
+    bg.is_transitioning = False
+    resolution = pilots.RenderResolution((pilots.screen_width, pilots.screen_height), scale)
+    camera = [0]
+
+    def draw():
+        camera[0] += 5
+        frame = resolution.begin(pilots.screen)
+        bg.draw(camera[0], frame)
+        resolution.present(frame, pilots.screen)
+    return draw
+
+
+def pilots_transition(level):
+    """Draw frames from the middle of the fade into a level's environment"""
+    bg = pilots.BackgroundManager()
+    bg.set_background_for_level(level - 1, force=True)
+    camera = [0]
+
+    def before():
+        bg.set_background_for_level(level, force=True)
+        bg.transition_timer = bg.transition_duration // 2
+
+    def draw():
+        camera[0] += 5
+        bg.draw(camera[0])
+    return draw, before
+
+
+def pilots1_background(season, place):
+    bg = pilots1.BackgroundManager()
+    bg.current_season, bg.current_location = season, place
+    bg.current_bg = bg.get_background(season, place)
+    if season == "rainy":
+        bg._init_rain()
+    elif season == "night":
+        bg._init_stars()
+    camera = [0]
+
+    def draw():
+        camera[0] += 5
+        bg.update_weather()
+        bg.draw(camera[0])
+    return draw
+
+
+def pilots1_transition(level):
+    """Draw the first frame after switching to a level's environment"""
+    bg = pilots1.BackgroundManager()
+
+    def before():
+        bg.set_background_for_level(level - 1)
+
+    def draw():
+        bg.set_background_for_level(level)
+        bg.update_weather()
+        bg.draw(0)
+    return draw, before
+
+
+# Enemy fields
+
+def enemy_positions(count, player_x, seed=0):
+    rng = random.Random(seed)
+    width = max(2000, count * 5)
+    return [(player_x - pilots.screen_width // 2 + rng.randint(0, width),
+             rng.randint(100, pilots.screen_height - 100)) for _ in range(count)]
+
+
+def player(module):
+    flight = module.Flight(module.screen_width // 4, module.screen_height // 2, 0.3, 5, 5, is_enemy=False)
+    flight.update_collision_data()
+    return flight
+
+
+def pilots_field(count, arrays=False):
+    flight = player(pilots)
+    enemies = pilots.SortedEnemies(pilots.EnemyArrays(pilots.screen_height) if arrays else None)
+    for x, y in enemy_positions(count, flight.world_x):
+        enemy = pilots.Flight(x, y, 0.3, 2, 0, is_enemy=True)
+        enemy.update_collision_data()
+        enemies.add(enemy)
+    return flight, enemies
+
+
+def pilots1_field(count):
+    flight = player(pilots1)
+    enemies = []
+    for x, y in enemy_positions(count, flight.world_x):
+        enemy = pilots1.Flight(x, y, 0.3, 2, 0, is_enemy=True)
+        enemy.update_collision_data()
+        enemies.append(enemy)
+    return flight, enemies
+
+
+def pilots_collisions(count):
+    flight, enemies = pilots_field(count)
+    # Keep the player invulnerable so the field stays the same size
+    return lambda: pilots.check_collisions(flight, enemies, current_time=0)
+
+
+def pilots1_collisions(count):
+    flight, enemies = pilots1_field(count)
+    flight.last_hit_time = float("inf")
+    return lambda: pilots1.check_collisions(flight, enemies)
+
+
+def pilots_flights(count):
+    """Queue and draw a field of enemies and the player the way a game frame does"""
+    flight, enemies = pilots_field(count)
+    camera_x = flight.world_x - pilots.screen_width // 4
+
+    def draw():
+        for enemy in enemies.visible(camera_x, pilots.screen_width):
+            pilots.sprite_queue.add("enemies", *enemy.blit_args(camera_x))
+        pilots.sprite_queue.add("player", *flight.blit_args(camera_x))
+        pilots.sprite_queue.flush(pilots.screen)
+    return draw
+
+
+def narrow_phase(level, tests=200, seed=0):
+    """Pixel-exact tests of the player against one enemy at a level's scale, at offsets where the boxes overlap"""
+    flight = player(pilots)
+    enemy = pilots.Flight(0, 0, pilots.DEFAULT_DIFFICULTY.enemy_scale(level), 2, 0, is_enemy=True)
+    width, height = flight.mask.get_size()
+    enemy_width, enemy_height = enemy.mask.get_size()
+    rng = random.Random(seed)
+    offsets = [(rng.randint(-enemy_width, width), rng.randint(-enemy_height, height)) for _ in range(tests)]
+
+    def test():
+        for offset in offsets:
+            flight.mask.overlap(enemy.mask, offset)
+    return test
+
+
+def pilots_movement(count, arrays=False):
+    flight, enemies = pilots_field(count, arrays)
+    return lambda: enemies.move(flight, 3)
+
+
+def pilots1_movement(count):
+    flight, enemies = pilots1_field(count)
+
+    def move():
+        for enemy in enemies:
+            enemy.enemy_movement(flight, 3)
+    return move
+
+
+def pilots_spawn(live=32):
+    """Spawn one enemy, retiring the oldest beyond live enemies like the game does"""
+    enemies = pilots.SortedEnemies()
+    player_x = [0]
+
+    def before():
+        player_x[0] += 10
+        if len(enemies) >= live:
+            oldest = next(iter(enemies))
+            enemies.remove(oldest)
+            pilots.enemy_pool.release(oldest)
+
+    def spawn():
+        pilots.spawn_enemy(enemies, player_x[0], 800, 3)
+    return spawn, before
+
+
+def pilots1_spawn(live=32):
+    enemies = []
+    player_x = [0]
+
+    def before():
+        player_x[0] += 10
+        if len(enemies) >= live:
+            enemies.pop(0)
+
+    def spawn():
+        pilots1.spawn_enemy(enemies, player_x[0], 800, 3)
+    return spawn, before
+
+
+def level_info(module, transition):
+    manager = module.LevelManager()
+    manager.current_level = 3
+    manager.show_transition = transition
+    return lambda: manager.draw_level_info(module.screen)
+
+
+def benchmarks():
+    items = []
+    for season in SEASONS:
+        for place in PLACES:
+            items.append(Benchmark(f"background/pilots/{season}-{place}", partial(pilots_background, season, place)))
+            items.append(Benchmark(f"background/pilots1/{season}-{place}", partial(pilots1_background, season, place)))
+    for scale in pilots.RenderResolution.SCALES[1:]:
+        for season in SEASONS:
+            for place in PLACES:
+                items.append(Benchmark(f"background/pilots/{season}-{place}@{scale}",
+                                       partial(pilots_background, season, place, scale)))
+    for level in range(2, 7):
+        items.append(Benchmark(f"background/pilots/transition-{level}", partial(pilots_transition, level)))
+        items.append(Benchmark(f"background/pilots1/transition-{level}", partial(pilots1_transition, level)))
+
+    for count in (10, 100, 1000):
+        items.append(Benchmark(f"check_collisions/pilots/{count}", partial(pilots_collisions, count)))
+        items.append(Benchmark(f"check_collisions/pilots1/{count}", partial(pilots1_collisions, count)))
+
+    for count in (10, 100, 1000):
+        items.append(Benchmark(f"draw_flights/pilots/{count}", partial(pilots_flights, count)))
+
+    for level in (1, 20, 40):
+        items.append(Benchmark(f"narrow_phase/pilots/level-{level}", partial(narrow_phase, level)))
+
+    items.append(Benchmark("spawn_enemy/pilots", pilots_spawn))
+    items.append(Benchmark("spawn_enemy/pilots1", pilots1_spawn))
+
+    for count in (100, 1000):
+        items.append(Benchmark(f"enemy_movement/pilots/{count}", partial(pilots_movement, count)))
+        items.append(Benchmark(f"enemy_movement/pilots-numpy/{count}", partial(pilots_movement, count, True)))
+        items.append(Benchmark(f"enemy_movement/pilots1/{count}", partial(pilots1_movement, count)))
+
+    for transition in (False, True):
+        suffix = "transition" if transition else "hud"
+        items.append(Benchmark(f"draw_level_info/pilots/{suffix}", partial(level_info, pilots, transition)))
+        items.append(Benchmark(f"draw_level_info/pilots1/{suffix}", partial(level_info, pilots1, transition)))
+    return items
+
+
+def compare(results, baseline, threshold):
+    """Return the names of benchmarks slower or allocating more than their baseline"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        result["change"] = result["mean_us"] / base["mean_us"] - 1 if base["mean_us"] else 0.0
+        slower = (result["mean_us"] > base["mean_us"] * (1 + threshold) or
+                  result["p95_us"] > base["p95_us"] * (1 + threshold))
+        if slower or result["surfaces"] > base["surfaces"] + 0.01:
+            regressions.append(name)
+    return regressions
+
+
+def print_results(results, regressions=()):
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}}  {'mean us':>9}  {'p95 us':>9}  {'surfaces':>8}  {'peak KiB':>8}  {'change':>7}")
+    for name, r in results.items():
+        change = f"{r['change']:+7.1%}" if "change" in r else ""
+        flag = "  REGRESSED" if name in regressions else ""
+        print(f"{name:<{width}}  {r['mean_us']:9.1f}  {r['p95_us']:9.1f}  {r['surfaces']:8.2f}  "
+              f"{r['peak_kib']:8.1f}  {change:>7}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game's hot paths headless")
+    parser.add_argument("-k", dest="pattern", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--calls", type=int, default=200, help="timed calls per benchmark")
+    parser.add_argument("--alloc-calls", type=int, default=20, help="calls in the allocation pass")
+    parser.add_argument("--baseline", default="bench_baseline.json", help="baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="compare against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before a regression")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            parser.error(f"no baseline at {args.baseline}; record one with --save-baseline")
+
+    # Benchmarks never open a real window, and keep the sound card closed.
+    # pilots1 goes first: its pygame.init() briefly starts the mixer, which
+    # must not happen while pilots loads its sounds in the background.
+    pilots1.init(headless=True, sound=False)
+    pilots.init(headless=True, sound=False)
+    pilots.assets.wait()
+    pilots.streams.reseed(0)
+    pilots1.random.seed(0)
+
+    selected = [benchmark for benchmark in benchmarks() if args.pattern in benchmark.name]
+    results = {benchmark.name: benchmark.time(args.calls) for benchmark in selected}
+
+    # Tracing slows everything down, so it runs once, after all the timings
+    tracemalloc.start()
+    for benchmark in selected:
+        results[benchmark.name].update(benchmark.allocations(args.alloc_calls))
+    tracemalloc.stop()
+
+    regressions = []
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+    print_results(results, regressions)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update({name: {k: v for k, v in r.items() if k != "change"} for name, r in results.items()})
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
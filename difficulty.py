@@ -0,0 +1,41 @@
+class Difficulty:
+    """Tunable difficulty parameters and the formulas that turn them into per-level values.
+
+    The defaults reproduce the game's original balance.
+    """
+
+    def __init__(self, spawn_cooldown_base=120, spawn_cooldown_step=30, spawn_cooldown_min=30,
+                 enemy_scale_base=0.3, enemy_scale_step=0.1, enemy_speed_base=2, enemy_speed_step=1,
+                 level_spacing=1000, max_level=6):
+        self.spawn_cooldown_base = spawn_cooldown_base
+        self.spawn_cooldown_step = spawn_cooldown_step
+        self.spawn_cooldown_min = spawn_cooldown_min
+        self.enemy_scale_base = enemy_scale_base
+        self.enemy_scale_step = enemy_scale_step
+        self.enemy_speed_base = enemy_speed_base
+        self.enemy_speed_step = enemy_speed_step
+        self.level_spacing = level_spacing
+        self.max_level = max_level
+
+    @classmethod
+    def parameter_names(cls):
+        return list(cls().as_dict())
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def spawn_cooldown(self, level):
+        """Frames between enemy spawns; spawn faster in higher levels"""
+        return max(self.spawn_cooldown_min, self.spawn_cooldown_base - level * self.spawn_cooldown_step)
+
+    def enemy_scale(self, level):
+        """Sprite scale of new enemies; bigger enemies in higher levels"""
+        return self.enemy_scale_base * (1 + (level - 1) * self.enemy_scale_step)
+
+    def enemy_vertical_speed(self, level):
+        """Vertical speed of new enemies; faster vertical movement in higher levels"""
+        return self.enemy_speed_base + (level - 1) * self.enemy_speed_step
+
+    def level_thresholds(self):
+        """Distance needed to reach each level"""
+        return {level: (level - 1) * self.level_spacing for level in range(1, self.max_level + 1)}
@@ -0,0 +1,243 @@
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+import numpy as np
+
+
+class EnemyPool:
+    """Recycles retired enemy flights instead of building new ones.
+
+    factory(x, y, scale, vertical_speed) builds a flight when the pool is empty.
+    Retired flights are kept up to capacity and brought back with respawn().
+    """
+
+    def __init__(self, factory, capacity=64):
+        self.factory = factory
+        self.capacity = capacity
+        self.free = []
+        self.live = 0
+        self.hits = 0
+        self.misses = 0
+        self.peak_live = 0
+
+    def acquire(self, x, y, scale, vertical_speed):
+        """Return an enemy placed at (x, y), reusing a retired one if possible"""
+        if self.free:
+            enemy = self.free.pop()
+            enemy.respawn(x, y, scale, vertical_speed)
+            self.hits += 1
+        else:
+            enemy = self.factory(x, y, scale, vertical_speed)
+            self.misses += 1
+
+        self.live += 1
+        self.peak_live = max(self.peak_live, self.live)
+        return enemy
+
+    def release(self, enemy):
+        """Retire an enemy that has been hit or left behind"""
+        self.live -= 1
+        if len(self.free) < self.capacity:
+            self.free.append(enemy)
+
+    def release_all(self, enemies):
+        for enemy in enemies:
+            self.release(enemy)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "live": self.live,
+            "peak_live": self.peak_live,
+            "free": len(self.free)
+        }
+
+
+class SortedEnemies:
+    """Live enemies kept sorted by world_x for a sweep-and-prune broadphase.
+
+    Enemies never move horizontally, so the order only changes on add and
+    remove. New enemies spawn ahead of the player, so add() is usually an
+    append, and the ones the player leaves behind are always at the front.
+    retire_behind() drops those by moving a head index past them; the lists
+    are only compacted once more than half of them is retired, so each
+    retirement costs O(1) on average.
+    """
+
+    def __init__(self, arrays=None):
+        self.enemies = []
+        self.xs = []
+        self.head = 0
+        self.max_radius = 0
+        self.max_width = 0
+        self.arrays = arrays
+
+    def __iter__(self):
+        return islice(self.enemies, self.head, None)
+
+    def __len__(self):
+        return len(self.enemies) - self.head
+
+    def add(self, enemy):
+        i = len(self.xs)
+        while i > self.head and self.xs[i - 1] > enemy.world_x:
+            i -= 1
+        self.enemies.insert(i, enemy)
+        self.xs.insert(i, enemy.world_x)
+        self.max_radius = max(self.max_radius, enemy.collision_radius)
+        self.max_width = max(self.max_width, enemy.rect.width)
+        if self.arrays is not None:
+            self.arrays.add(enemy)
+
+    def remove(self, enemy):
+        i = bisect_left(self.xs, enemy.world_x, self.head)
+        while self.enemies[i] is not enemy:
+            i += 1
+        del self.enemies[i]
+        del self.xs[i]
+        if not len(self):
+            self.max_radius = self.max_width = 0
+        if self.arrays is not None:
+            self.arrays.remove(enemy)
+
+    def retire_behind(self, x):
+        """Remove and return the enemies whose world_x is below x, front first"""
+        end = bisect_left(self.xs, x, self.head)
+        retired = self.enemies[self.head:end]
+        self.head = end
+        if self.head * 2 > len(self.enemies):
+            del self.enemies[:self.head]
+            del self.xs[:self.head]
+            self.head = 0
+        if not len(self):
+            self.max_radius = self.max_width = 0
+        if self.arrays is not None:
+            for enemy in retired:
+                self.arrays.remove(enemy)
+        return retired
+
+    def overlapping(self, x_min, x_max):
+        """Return the enemies whose world_x lies within [x_min, x_max]"""
+        return self.enemies[bisect_left(self.xs, x_min, self.head):bisect_right(self.xs, x_max, self.head)]
+
+    def visible(self, left, width):
+        """Return the enemies drawn at least partly within [left, left + width)"""
+        return self.overlapping(left - self.max_width, left + width)
+
+    def move(self, player, level):
+        """Run one frame of enemy movement, vectorised when arrays are attached"""
+        if self.arrays is not None:
+            self.arrays.update(player.world_x, level)
+            self.arrays.sync(self)
+        else:
+            for enemy in self:
+                enemy.enemy_movement(player, level)
+
+
+class EnemyArrays:
+    """Struct-of-arrays enemy simulation backed by NumPy.
+
+    Mirrors Flight.enemy_movement for every enemy at once. Flights stay
+    attached through their slot index and only get their position and
+    movement state written back by sync().
+    """
+
+    def __init__(self, screen_height, capacity=256, rng=None):
+        self.screen_height = screen_height
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.free_slots = []
+        self.size = 0
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        """Create (or grow) the backing arrays"""
+        fields = {
+            "x": np.float64, "y": np.float64, "height": np.float64, "altitude": np.float64,
+            "direction": np.int64, "timer": np.int64, "delay": np.int64,
+            "passed": np.bool_, "active": np.bool_
+        }
+        for name, dtype in fields.items():
+            grown = np.zeros(capacity, dtype=dtype)
+            if hasattr(self, name):
+                old = getattr(self, name)
+                grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    def add(self, enemy):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.size == len(self.x):
+                self.allocate(len(self.x) * 2)
+            slot = self.size
+            self.size += 1
+
+        self.x[slot] = enemy.world_x
+        self.y[slot] = enemy.rect.y
+        self.height[slot] = enemy.rect.height
+        self.altitude[slot] = enemy.altitude
+        self.direction[slot] = enemy.direction
+        self.timer[slot] = enemy.vertical_movement_timer
+        self.delay[slot] = enemy.change_direction_delay
+        self.passed[slot] = enemy.has_been_passed
+        self.active[slot] = True
+        enemy.slot = slot
+
+    def remove(self, enemy):
+        self.active[enemy.slot] = False
+        self.free_slots.append(enemy.slot)
+        enemy.slot = None
+
+    def update(self, player_x, level):
+        """Advance every active enemy by one frame"""
+        n = self.size
+        active = self.active[:n]
+        y = self.y[:n]
+        direction = self.direction[:n]
+        timer = self.timer[:n]
+        delay = self.delay[:n]
+
+        # Check if player has passed each enemy
+        self.passed[:n] |= active & (player_x > self.x[:n])
+
+        # Vertical movement with level-based difficulty
+        timer += active
+        flip = active & (timer >= delay)
+        count = int(flip.sum())
+        if count:
+            direction[flip] *= -1
+            timer[flip] = 0
+            delay[flip] = self.rng.integers(max(30, 120 - level * 20), max(60, 180 - level * 30) + 1, size=count)
+
+        # Faster vertical movement in higher levels, rounded like pygame.Rect
+        vertical_speed = self.altitude[:n] * 0.5 * (1 + (level - 1) * 0.3)
+        moved = y + direction * vertical_speed
+        moved = np.sign(moved) * np.floor(np.abs(moved) + 0.5)
+        y[active] = moved[active]
+
+        top = active & (y < 0)
+        y[top] = 0
+        direction[top] = 1
+        timer[top] = 0
+
+        bottom = active & (y + self.height[:n] > self.screen_height)
+        y[bottom] = self.screen_height - self.height[:n][bottom]
+        direction[bottom] = -1
+        timer[bottom] = 0
+
+    def sync(self, enemies):
+        """Write the simulated state back onto the Flight views"""
+        y = self.y.tolist()
+        direction = self.direction.tolist()
+        timer = self.timer.tolist()
+        delay = self.delay.tolist()
+        passed = self.passed.tolist()
+        for enemy in enemies:
+            slot = enemy.slot
+            enemy.rect.y = y[slot]
+            enemy.world_y = enemy.rect.y
+            enemy.direction = direction[slot]
+            enemy.vertical_movement_timer = timer[slot]
+            enemy.change_direction_delay = delay[slot]
+            enemy.has_been_passed = passed[slot]
@@ -0,0 +1,58 @@
+"""Lazy start-up of pygame's subsystems, shared by both games.
+
+Importing a game module only defines its classes and functions. Nothing
+touches the display, the sound card or the font renderer until the game's
+init() starts the ones it needs, so benchmarks, profilers and worker
+processes can import the simulation without opening a window.
+"""
+import os
+
+import pygame
+
+from assets import StartupProfile
+
+# Wall-clock time of every start-up step, for --profile-startup
+startup = StartupProfile()
+
+
+def use_dummy_drivers():
+    """Run without a window or sound card; only works before the display and mixer start"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+def init_display(size, caption, flags=0):
+    """Open the game window, starting the display first if needed"""
+    if not pygame.display.get_init():
+        startup.timed("pygame.display.init", pygame.display.init)
+    screen = startup.timed("pygame.display.set_mode", lambda: pygame.display.set_mode(size, flags))
+    pygame.display.set_caption(caption)
+    return screen
+
+
+def init_fonts():
+    if not pygame.font.get_init():
+        startup.timed("pygame.font.init", pygame.font.init)
+
+
+def init_mixer():
+    """Start the mixer; returns False when there is no audio device"""
+    if pygame.mixer.get_init() is None:
+        try:
+            startup.timed("pygame.mixer.init", pygame.mixer.init)
+        except pygame.error:
+            return False
+    return True
+
+
+def init_remaining(mixer=True):
+    """Start the rest of pygame, such as the timer behind pygame.time.get_ticks().
+
+    Call it after the other init functions: pygame.init() starts every
+    subsystem still down, which would hide their own steps from the startup
+    profile. Without mixer, the sound card is left closed.
+    """
+    startup.timed("pygame.init (remaining modules)", pygame.init)
+    if not mixer:
+        # pygame.init() starts the mixer along with everything else
+        pygame.mixer.quit()
@@ -0,0 +1,150 @@
+import queue
+import threading
+from collections import OrderedDict
+
+import pygame
+
+from render_cache import to_display_format
+
+# Tiles are cleared to this color, which is left out when they are drawn
+TRANSPARENT = (255, 0, 255)
+
+# One background thread renders tiles for every cache in the process
+render_jobs = queue.Queue()
+render_thread = None
+
+
+def render_worker():
+    while True:
+        job = render_jobs.get()
+        job()
+
+
+def submit(job):
+    """Run job() on the background render thread"""
+    global render_thread
+    if render_thread is None:
+        render_thread = threading.Thread(target=render_worker, name="tile-renderer", daemon=True)
+        render_thread.start()
+    render_jobs.put(job)
+
+
+class ParallaxLayer:
+    """One scrolling layer of the world, cut into fixed-width tiles.
+
+    The layer scrolls at factor times the offset it is drawn at. Tiles span
+    tile_width pixels of the layer and height pixels down from top on the
+    screen. render(tile, left, variant) draws the tile that starts at layer
+    coordinate left onto a transparent surface; it must only depend on its
+    arguments, since tiles can be rendered in any order on any thread. Tiles
+    are drawn opaque, or at a surface alpha for the whole layer.
+    """
+
+    def __init__(self, name, factor, tile_width, top, height, render, alpha=None):
+        self.name = name
+        self.factor = factor
+        self.tile_width = tile_width
+        self.top = top
+        self.height = height
+        self.render = render
+        self.alpha = alpha
+
+    def tile_range(self, offset, view_width):
+        """Return the layer position and the range of tiles in view"""
+        x = offset * self.factor
+        first = int(x // self.tile_width)
+        return x, first, first + int(view_width // self.tile_width) + 2
+
+
+class TileCache:
+    """Rendered parallax tiles, streamed in ahead of the camera.
+
+    Tiles just ahead of the view are rendered on the background thread, a
+    tile needed before it arrives is rendered on the spot, and beyond
+    capacity the least recently drawn tiles, the ones the player has left
+    behind, are dropped. Drawing a layer is then one blit per tile in view.
+    """
+
+    def __init__(self, capacity=64, lookahead=2, threaded=True):
+        self.capacity = capacity
+        self.lookahead = lookahead
+        self.threaded = threaded
+        self.tiles = OrderedDict()
+        self.pending = set()
+        self.finished = queue.Queue()
+        # Layers may share state such as atlases, so tiles render one at a time
+        self.render_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.streamed = 0
+
+    def render(self, layer, variant, index, scale=1.0):
+        tile = pygame.Surface((layer.tile_width, layer.height))
+        tile.fill(TRANSPARENT)
+        with self.render_lock:
+            layer.render(tile, index * layer.tile_width, variant)
+        if scale != 1.0:
+            # Nearest-neighbour scaling keeps the transparent color exact
+            tile = pygame.transform.scale(tile, (round(layer.tile_width * scale), round(layer.height * scale)))
+        return tile
+
+    def store(self, key, tile, layer):
+        # Run-length encoded colorkey blits skip the empty parts of a tile,
+        # which is much cheaper than blending it pixel by pixel
+        tile = to_display_format(tile)
+        tile.set_colorkey(TRANSPARENT, pygame.RLEACCEL)
+        if layer.alpha is not None:
+            tile.set_alpha(layer.alpha, pygame.RLEACCEL)
+        self.tiles[key] = tile
+        if len(self.tiles) > self.capacity:
+            self.tiles.popitem(last=False)
+        return tile
+
+    def collect(self):
+        """Take in the tiles the background thread has finished"""
+        while True:
+            try:
+                key, tile, layer = self.finished.get_nowait()
+            except queue.Empty:
+                return
+            self.pending.discard(key)
+            if key not in self.tiles:
+                self.store(key, tile, layer)
+                self.streamed += 1
+
+    def get(self, layer, variant, index, scale=1.0):
+        key = (layer.name, variant, index, scale)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+
+        self.misses += 1
+        return self.store(key, self.render(layer, variant, index, scale), layer)
+
+    def prefetch(self, layer, variant, index, scale=1.0):
+        key = (layer.name, variant, index, scale)
+        if not self.threaded or key in self.tiles or key in self.pending:
+            return
+        self.pending.add(key)
+        submit(lambda: self.finished.put((key, self.render(layer, variant, index, scale), layer)))
+
+    def draw(self, surface, layer, offset, variant=None, scale=1.0):
+        """Draw the tiles of layer in view at offset, and queue the next ones.
+
+        With a scale, surface is that many times the size of the logical
+        view, and tiles are drawn shrunk or stretched to match.
+        """
+        self.collect()
+        x, first, end = layer.tile_range(offset, surface.get_width() / scale)
+        # Tile widths scale to whole pixels, so only the scroll position is rounded
+        shift = round(x * scale)
+        top = round(layer.top * scale)
+        surface.blits([(self.get(layer, variant, index, scale), (round(index * layer.tile_width * scale) - shift, top))
+                       for index in range(first, end)], doreturn=False)
+        for index in range(end, end + self.lookahead):
+            self.prefetch(layer, variant, index, scale)
+
+    def clear(self):
+        self.tiles.clear()
@@ -1,28 +1,101 @@
+import argparse
 import pygame
 import random
 import sys
+import time
 from pygame import mixer
-
-# Pygame setup
-pygame.init()
+from assets import AssetLoader, PcmCache, SilentSound, SpriteRegistry, load_sound, load_stream
+from audio import AudioManager
+from enemies import EnemyArrays, EnemyPool, SortedEnemies
+from render_cache import FontRegistry, LayerCache, RenderQueue, SurfacePool, TextCache, to_display_format
+from weather import RainParticles
+from skyline import Skyline
+from parallax import ParallaxLayer, TileCache
+from autopilot import POLICIES
+from rng import RandomStreams, derive_seed, index_hash
+from difficulty import Difficulty
+from profiler import FrameProfiler
+from resolution import RenderResolution
+from quality import QualityGovernor
+from engine import startup
+import engine
+import replay
+
+# The window is opened by init(); until then the simulation runs without one
 screen_width, screen_height = 1280, 720
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Endless Flight Game")
+screen = None
 clock = pygame.time.Clock()
 
-# Defined audios
-plane_fx = pygame.mixer.Sound('audio/commercial-aircraft-in-flight-sounds-17309.wav')
-plane_fx.set_volume(0.5)
-enemy_fx = pygame.mixer.Sound('audio/jetSound.wav')
-enemy_fx.set_volume(0.3)
-level_up_fx = pygame.mixer.Sound('audio/Levelup-sound.wav')
-level_up_fx.set_volume(0.7)
-
-# Define camera offset
-camera_offset_x = 0
+# Random streams for world generation, spawning, enemy AI and visual effects,
+# reseeded at the start of every session
+streams = RandomStreams()
+
+# The game's standard balance; sweeps run sessions with other settings
+DEFAULT_DIFFICULTY = Difficulty()
+
+# Sprite images and masks, decoded once and shared by every flight
+sprites = SpriteRegistry("images")
+PLAYER_SPRITE = "TempFlightFigure.png"
+ENEMY_SPRITE = "jet_fighter_PNG7.png"
+
+# Everything the game loads from disk, on a background thread. The sprites
+# are needed before the first frame; the sounds may arrive a little later.
+# The long engine ambience streams from disk, while the short effects are
+# held in memory and cached as raw samples. A missing file falls back to
+# silence.
+ASSET_MANIFEST = [
+    {"name": PLAYER_SPRITE, "kind": "sprite", "essential": True},
+    {"name": ENEMY_SPRITE, "kind": "sprite", "essential": True},
+    {"name": "engine", "kind": "stream", "path": "audio/commercial-aircraft-in-flight-sounds-17309.wav", "volume": 0.5},
+    {"name": "enemy_jet", "kind": "sound", "path": "audio/jetSound.wav", "volume": 0.3},
+    {"name": "level_up", "kind": "sound", "path": "audio/Levelup-sound.wav", "volume": 0.7}
+]
+pcm_cache = PcmCache("audio/.pcm_cache")
+assets = AssetLoader(ASSET_MANIFEST,
+                     loaders={"sprite": lambda entry: sprites.load(entry["name"]),
+                              "sound": lambda entry: load_sound(entry, pcm_cache),
+                              "stream": load_stream},
+                     fallbacks={"sound": SilentSound, "stream": SilentSound})
+
+# The engine streams through the music player, so effects share every
+# channel, a few enemy jets at a time, with the level-up jingle taking
+# priority. Every sound is silent until init() opens the mixer.
+audio = AudioManager(assets.get, loops=())
+audio.configure("enemy_jet", limit=4, priority=0)
+audio.configure("level_up", limit=1, priority=1)
+
+# Solid-color surfaces shared by every scenery renderer
+surface_pool = SurfacePool()
+
+# Per-phase frame timings, off unless the overlay or a trace is requested
+profiler = FrameProfiler()
+
+# Flights are queued while the frame is built and drawn a layer per call,
+# enemies first so the player stays on top
+sprite_queue = RenderQueue(("enemies", "player"))
+
+# Fonts are loaded once and rendered text is reused until it changes
+fonts = FontRegistry()
+text_cache = TextCache(fonts)
+
+# The world is drawn at this resolution and scaled to the window; the HUD is
+# drawn over it at the window's own
+resolution = RenderResolution((screen_width, screen_height))
+
+# How much scenery and weather detail is drawn; adaptive in the window, so
+# weak machines trade detail for a steady 60 FPS
+quality = QualityGovernor()
 
 
 class BackgroundManager:
+    # Particle counts at full quality
+    star_count = 100
+    rain_count = 200
+
+    # Scenery tiles reach this far above and below the horizon
+    scenery_height = 250
+    scenery_depth = 110
+
     def __init__(self):
         # Base backgrounds for seasons
         self.seasons = {
@@ -73,23 +146,9 @@ class BackgroundManager:
         # Pick a random starting environment
         self.randomize_environment()
 
-        # Generate stars for night sky
-        self.stars = []
-        for _ in range(100):
-            self.stars.append((random.randint(0, screen_width),
-                               random.randint(0, screen_height // 2)))
-
-        # Generate clouds
-        self.clouds = []
-        for _ in range(10):
-            self.clouds.append((random.randint(0, screen_width * 2),
-                                random.randint(50, screen_height // 3)))
-
         # Generate raindrops for rainy season
-        self.raindrops = []
-        for _ in range(200):
-            self.raindrops.append([random.randint(0, screen_width),
-                                   random.randint(0, screen_height)])
+        self.raindrops = RainParticles(self.rain_count, screen_width, screen_height,
+                                       streams.numpy("effects", "rain"))
 
         # For scrolling effect
         self.scroll_offset = 0
@@ -102,9 +161,31 @@ class BackgroundManager:
         self.old_place = self.current_place
         self.transition_progress = 0
 
+        # Pre-rendered sky and ground for each (season, place) pair, plus one
+        # reusable layer for fading environments in and out
+        self.layer_cache = LayerCache((screen_width, screen_height))
+        self.transition_layer = None
+
+        # Stable, endless city skyline for this session
+        self.skyline = Skyline(streams.seed)
+
+        # Scrolling scenery is cut into world tiles that are rendered once,
+        # ahead of the camera. Stars and clouds scroll with the parallax
+        # offset, hills and the ground with the camera.
+        ground_y = screen_height - screen_height // 3
+        self.tile_seeds = {name: derive_seed(streams.seed, name) for name in ("stars", "clouds", "hills")}
+        self.star_layer = ParallaxLayer("stars", 0.2, 640, 0, screen_height // 2, self.render_stars)
+        self.cloud_layer = ParallaxLayer("clouds", 0.5, 640, 50, screen_height // 3 + 10, self.render_clouds,
+                                         alpha=200)
+        self.hill_layer = ParallaxLayer("hills", 0.3, 400, ground_y - self.scenery_height,
+                                        self.scenery_height + self.scenery_depth, self.render_hills)
+        self.ground_layer = ParallaxLayer("ground", 1.0, 600, ground_y - self.scenery_height,
+                                          self.scenery_height + self.scenery_depth, self.render_ground)
+        self.tiles = TileCache()
+
     def randomize_environment(self):
         """Pick a random environment from all possible combinations"""
-        env = random.choice(self.all_environments)
+        env = streams.world.choice(self.all_environments)
         self.current_season = env["season"]
         self.current_place = env["place"]
 
@@ -125,7 +206,7 @@ class BackgroundManager:
             return level_environments[level - 1]
         else:
             # For levels beyond our predefined set, return a random environment
-            return random.choice(self.all_environments)
+            return streams.world.choice(self.all_environments)
 
     def set_background_for_level(self, level, force=False):
         """Change the background for the current level with smooth transition"""
@@ -152,7 +233,15 @@ class BackgroundManager:
             if self.transition_timer >= self.transition_duration:
                 self.is_transitioning = False
 
-    def draw(self, camera_offset):
+    def draw(self, camera_offset, surface=None):
+        """Draw the background onto surface, the screen unless given.
+
+        A surface smaller or larger than the screen gets the same view,
+        drawn at its resolution.
+        """
+        if surface is None:
+            surface = screen
+
         # Update transition if active
         self.update_transition()
 
@@ -162,201 +251,139 @@ class BackgroundManager:
         # Handle drawing with potential transition
         if self.is_transitioning:
             # Draw the old background with fading opacity
-            self.draw_environment(self.old_season, self.old_place, camera_offset, 1.0 - self.transition_progress)
+            self.draw_environment(surface, self.old_season, self.old_place, camera_offset,
+                                  1.0 - self.transition_progress)
             # Draw the new background with increasing opacity
-            self.draw_environment(self.current_season, self.current_place, camera_offset, self.transition_progress)
+            self.draw_environment(surface, self.current_season, self.current_place, camera_offset,
+                                  self.transition_progress)
         else:
             # Draw the current background at full opacity
-            self.draw_environment(self.current_season, self.current_place, camera_offset, 1.0)
+            self.draw_environment(surface, self.current_season, self.current_place, camera_offset, 1.0)
 
-    def draw_environment(self, season, place, camera_offset, opacity=1.0):
+    def draw_environment(self, surface, season, place, camera_offset, opacity=1.0):
         """Draw the environment with specified season and place at given opacity"""
-        # Create a surface for this layer
-        layer = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+        scale = surface.get_width() / screen_width
+        # Tiles are rendered per quality tier, so changing tier never mixes details
+        tier = quality.tier
+
+        # A fully opaque environment is drawn straight onto the surface. A
+        # fading one is drawn onto the reusable transition layer, which is then
+        # blended in with a single surface alpha.
+        if opacity >= 1.0:
+            layer = surface
+        else:
+            if self.transition_layer is None or self.transition_layer.get_size() != surface.get_size():
+                self.transition_layer = to_display_format(pygame.Surface(surface.get_size()))
+            layer = self.transition_layer
 
-        # Fill with season color (sky)
-        sky_color = self.seasons[season]
-        sky_color_with_alpha = (sky_color[0], sky_color[1], sky_color[2], int(255 * opacity))
-        layer.fill(sky_color_with_alpha)
+        # Sky, ground and other static parts come from the cache
+        layer.blit(self.get_static_layer(season, place, layer.get_size()), (0, 0))
 
         # Draw stars if it's night
         if season == "night":
-            for star_x, star_y in self.stars:
-                # Apply parallax effect
-                display_x = (star_x - self.scroll_offset * 0.2) % screen_width
-                star_surface = pygame.Surface((3, 3), pygame.SRCALPHA)
-                star_surface.fill((255, 255, 255, int(255 * opacity)))
-                layer.blit(star_surface, (display_x, star_y))
+            # Apply parallax effect
+            self.tiles.draw(layer, self.star_layer, self.scroll_offset, tier, scale)
 
         # Draw clouds for sunny and rainy
         if season != "night":
-            for cloud_x, cloud_y in self.clouds:
-                # Apply parallax effect
-                display_x = (cloud_x - self.scroll_offset * 0.5) % (screen_width * 2)
-                if display_x < screen_width:
-                    cloud_surface = pygame.Surface((100, 60), pygame.SRCALPHA)
-                    cloud_surface.fill((255, 255, 255, int(200 * opacity)))
-                    layer.blit(cloud_surface, (display_x, cloud_y))
+            # Apply parallax effect
+            self.tiles.draw(layer, self.cloud_layer, self.scroll_offset, tier, scale)
 
         # Draw rain if it's rainy
         if season == "rainy":
-            for rain_x, rain_y in self.raindrops:
-                # Draw raindrop
-                rain_surface = pygame.Surface((2, 20), pygame.SRCALPHA)
-                rain_surface.fill((200, 200, 255, int(200 * opacity)))
-                layer.blit(rain_surface, (rain_x, rain_y))
-
-        # Draw ground (place-dependent)
-        ground_height = screen_height // 3
-        ground_color = self.places[place]
-        ground_color_with_alpha = (ground_color[0], ground_color[1], ground_color[2], int(255 * opacity))
-
-        ground_surface = pygame.Surface((screen_width, ground_height), pygame.SRCALPHA)
-        ground_surface.fill(ground_color_with_alpha)
-        layer.blit(ground_surface, (0, screen_height - ground_height))
+            rain_surface = surface_pool.get((max(1, round(2 * scale)), round(20 * scale)), (200, 200, 255), 200)
+            self.raindrops.draw(layer, [(rain_surface, (0, 0))], scale=scale,
+                                limit=int(self.rain_count * tier.particles))
 
         # Draw place-specific elements
-        self.draw_place_elements(layer, place, camera_offset, opacity)
+        self.draw_place_elements(layer, season, place, camera_offset, tier, scale)
 
-        # Blit the entire layer to the screen
-        screen.blit(layer, (0, 0))
+        # Blend a fading layer onto the surface
+        if layer is not surface:
+            layer.set_alpha(int(255 * opacity))
+            surface.blit(layer, (0, 0))
 
         # Update rain positions if it's rainy (we do this outside the surface blitting)
         if season == "rainy" and opacity > 0.5:  # Only update positions for the dominant background
-            for i, (rain_x, rain_y) in enumerate(self.raindrops):
-                # Update raindrop position
-                rain_y += random.randint(5, 15)
-                if rain_y > screen_height:
-                    rain_y = 0
-                    rain_x = random.randint(0, screen_width)
-                self.raindrops[i] = [rain_x, rain_y]
-
-    def draw_place_elements(self, surface, place, camera_offset, opacity=1.0):
-        # Draw specific elements based on the current place
-        if place == "farmland":
-            # Draw farms, fields, etc.
-            self.draw_farmland(surface, camera_offset, opacity)
-        elif place == "city":
-            # Draw buildings, roads, etc.
-            self.draw_city(surface, camera_offset, opacity)
-        elif place == "hill_country":
-            # Draw hills, mountains, etc.
-            self.draw_hills(surface, camera_offset, opacity)
-        elif place == "seaside":
-            # Draw ocean, beach, etc.
-            self.draw_seaside(surface, camera_offset, opacity)
+            self.raindrops.update()
 
-    def draw_farmland(self, surface, camera_offset, opacity=1.0):
-        # Draw farmland elements
-        ground_y = screen_height - screen_height // 3
+    def get_static_layer(self, season, place, size=(screen_width, screen_height)):
+        """Return the pre-rendered sky and ground for an environment at a resolution"""
+        if self.layer_cache.size != size:
+            # The render resolution changed; layers at the old one are no use
+            self.layer_cache = LayerCache(size)
 
-        # Draw fields with crops (simple rectangles)
-        field_width = 300
-        num_fields = screen_width // field_width + 2
+        def render(layer):
+            canvas = layer if size == (screen_width, screen_height) else pygame.Surface((screen_width, screen_height))
 
-        for i in range(num_fields):
-            field_x = i * field_width - camera_offset % field_width
-            field_rect = pygame.Rect(field_x, ground_y, field_width, 50)
-            field_color = (194, 178, 128, int(255 * opacity))  # Wheat field color with alpha
+            # Fill with season color (sky)
+            canvas.fill(self.seasons[season])
 
-            field_surface = pygame.Surface((field_width, 50), pygame.SRCALPHA)
-            field_surface.fill(field_color)
-            surface.blit(field_surface, (field_x, ground_y))
+            # Draw ground (place-dependent)
+            ground_height = screen_height // 3
+            canvas.fill(self.places[place], (0, screen_height - ground_height, screen_width, ground_height))
 
-            # Draw crop rows
-            crop_color = (139, 115, 85, int(255 * opacity))
-            for j in range(10):
-                row_x = field_x + j * 30
-                crop_surface = pygame.Surface((10, 50), pygame.SRCALPHA)
-                crop_surface.fill(crop_color)
-                surface.blit(crop_surface, (row_x, ground_y))
+            # Parts of the place that never scroll
+            self.draw_static_place_elements(canvas, place)
 
-        # Draw farm houses every 1000 pixels
-        house_spacing = 1000
-        scroll_offset_houses = camera_offset // 1
-        house_start = (scroll_offset_houses // house_spacing) * house_spacing
-
-        for i in range(3):  # Draw 3 houses in view
-            house_x = house_start + i * house_spacing - scroll_offset_houses
-            if 0 <= house_x <= screen_width:
-                # House body
-                house_color = (255, 0, 0, int(255 * opacity))
-                house_surface = pygame.Surface((150, 100), pygame.SRCALPHA)
-                house_surface.fill(house_color)
-                surface.blit(house_surface, (house_x, ground_y - 100))
-
-                # Roof
-                roof_color = (139, 69, 19, int(255 * opacity))
-                roof_points = [(0, 0), (95, -50), (190, 0)]
-                roof_surface = pygame.Surface((190, 50), pygame.SRCALPHA)
-                pygame.draw.polygon(roof_surface, roof_color, roof_points)
-                surface.blit(roof_surface, (house_x - 20, ground_y - 100))
-
-    def draw_city(self, surface, camera_offset, opacity=1.0):
-        # Draw city elements
-        ground_y = screen_height - screen_height // 3
+            if canvas is not layer:
+                pygame.transform.smoothscale(canvas, size, layer)
 
-        # Draw road
-        road_color = (50, 50, 50, int(255 * opacity))
-        road_surface = pygame.Surface((screen_width, 80), pygame.SRCALPHA)
-        road_surface.fill(road_color)
-        surface.blit(road_surface, (0, ground_y + 50))
+        return self.layer_cache.get((season, place), render)
 
-        # Draw road markings
-        marking_width = 50
-        num_markings = screen_width // marking_width + 2
-        for i in range(num_markings):
-            marking_x = i * marking_width * 2 - camera_offset % (marking_width * 2)
-            marking_color = (255, 255, 255, int(255 * opacity))
-            marking_surface = pygame.Surface((marking_width, 10), pygame.SRCALPHA)
-            marking_surface.fill(marking_color)
-            surface.blit(marking_surface, (marking_x, ground_y + 90))
-
-        # Draw buildings
-        building_width = 120
-        building_spacing = 150
-        num_buildings = screen_width // building_spacing + 2
-
-        for i in range(num_buildings):
-            building_x = i * building_spacing - camera_offset % building_spacing
-            height = random.randint(100, 250)
-            building_color = (100, 100, 100, int(255 * opacity))
-            building_surface = pygame.Surface((building_width, height), pygame.SRCALPHA)
-            building_surface.fill(building_color)
-            surface.blit(building_surface, (building_x, ground_y - height))
-
-            # Draw windows
-            for y in range(5):
-                for x in range(3):
-                    # Some windows are lit based on random chance and season
-                    if random.random() > 0.3:  # Some windows are lit
-                        if self.current_season == "night":
-                            window_color = (255, 255, 0, int(255 * opacity))
-                        else:
-                            window_color = (200, 200, 200, int(255 * opacity))
-                    else:
-                        window_color = (50, 50, 50, int(255 * opacity))
-
-                    window_surface = pygame.Surface((20, 30), pygame.SRCALPHA)
-                    window_surface.fill(window_color)
-                    surface.blit(window_surface, (building_x + 20 + x * 30, ground_y - height + 20 + y * 40))
-
-    def draw_hills(self, surface, camera_offset, opacity=1.0):
-        # Draw hill country elements
+    def draw_static_place_elements(self, surface, place):
         ground_y = screen_height - screen_height // 3
 
-        # Draw hills in the background
-        hill_points = []
-        parallax_factor = 0.3  # Hills move slower than the camera
-        adjusted_offset = camera_offset * parallax_factor
-
-        # First, establish base points across the width
-        for x in range(0, screen_width + 100, 100):
-            hill_points.append((x, ground_y - random.randint(50, 150)))
+        if place == "city":
+            # Road
+            surface.fill((50, 50, 50), (0, ground_y + 50, screen_width, 80))
+        elif place == "seaside":
+            # Ocean
+            surface.fill((0, 105, 148), (0, ground_y, screen_width, screen_height // 3))
+
+    def draw_place_elements(self, surface, season, place, camera_offset, tier, scale=1.0):
+        # Hills roll by slower than the camera
+        if place == "hill_country":
+            self.tiles.draw(surface, self.hill_layer, camera_offset, tier, scale)
+
+        # Farms, buildings, roads, boats, etc.
+        if place != "hill_country":
+            self.tiles.draw(surface, self.ground_layer, camera_offset, (season, place, tier), scale)
+
+    def render_stars(self, tile, left, tier):
+        # Stars for night sky, the same for every visit of a tile
+        rng = random.Random(index_hash(self.tile_seeds["stars"], left))
+        width, height = tile.get_size()
+        for _ in range(int(self.star_count * tier.stars) * width // screen_width):
+            tile.fill((255, 255, 255), (rng.randrange(width - 3), rng.randrange(height), 3, 3))
+
+    def render_clouds(self, tile, left, tier):
+        # Clouds hang over into the next tile, so draw the previous tile's too
+        width = tile.get_width()
+        for start in (left - width, left):
+            rng = random.Random(index_hash(self.tile_seeds["clouds"], start))
+            for _ in range(rng.randint(*tier.clouds)):
+                cloud_x = start + rng.randrange(width) - left
+                cloud_y = rng.randint(0, screen_height // 3 - 50)
+                tile.fill((255, 255, 255), (cloud_x, cloud_y, 100, 60))
+
+    def hill_height(self, x):
+        """Height of the hills above the ground at layer position x"""
+        i, t = divmod(x, 100)
+        left = 50 + index_hash(self.tile_seeds["hills"], i) % 101
+        right = 50 + index_hash(self.tile_seeds["hills"], i + 1) % 101
+        return left + (right - left) * t / 100
+
+    def render_hills(self, tile, left, tier):
+        ground_y = self.scenery_height
+        width = tile.get_width()
+
+        # Ridge points every 100 pixels, from just before to just after the tile
+        hill_points = [(x - left, ground_y - self.hill_height(x))
+                       for x in range(left - left % 100, left + width + 101, 100)]
 
         # Connect the points with a smooth line
-        hill_color = (100, 160, 100, int(255 * opacity))
-        pygame.draw.lines(surface, hill_color, False, hill_points, 5)
+        pygame.draw.lines(tile, (100, 160, 100), False, hill_points, 5)
 
         # Fill the area under the hills
         for i in range(len(hill_points) - 1):
@@ -366,93 +393,106 @@ class BackgroundManager:
                 (hill_points[i + 1][0], ground_y + 100),
                 (hill_points[i][0], ground_y + 100)
             ]
-            hill_fill_color = (110, 170, 110, int(255 * opacity))
-            pygame.draw.polygon(surface, hill_fill_color, hill_segment)
+            pygame.draw.polygon(tile, (110, 170, 110), hill_segment)
 
         # Draw trees on hills
-        tree_spacing = 150
-        num_trees = screen_width // tree_spacing + 2
-
-        for i in range(num_trees):
-            tree_x = i * tree_spacing - camera_offset % tree_spacing
-            # Find the y position on the hill
-            hill_idx = min(len(hill_points) - 1, int(tree_x / 100))
-            tree_base_y = hill_points[hill_idx][1]
+        tree_spacing = tier.tree_spacing
+        for tree_x in range((left - 60) // tree_spacing * tree_spacing, left + width + 30, tree_spacing):
+            tree_base_y = ground_y - self.hill_height(tree_x)
+            x = tree_x - left
 
             # Draw tree trunk
-            trunk_color = (139, 69, 19, int(255 * opacity))
-            trunk_surface = pygame.Surface((10, 40), pygame.SRCALPHA)
-            trunk_surface.fill(trunk_color)
-            surface.blit(trunk_surface, (tree_x, tree_base_y - 40))
+            tile.fill((139, 69, 19), (x, tree_base_y - 40, 10, 40))
 
             # Draw tree foliage (circle)
-            foliage_color = (34, 139, 34, int(255 * opacity))
-            foliage_surface = pygame.Surface((60, 60), pygame.SRCALPHA)
-            pygame.draw.circle(foliage_surface, foliage_color, (30, 30), 30)
-            surface.blit(foliage_surface, (tree_x - 25, tree_base_y - 90))
+            pygame.draw.circle(tile, (34, 139, 34), (x + 5, tree_base_y - 60), 30)
 
-    def draw_seaside(self, surface, camera_offset, opacity=1.0):
-        # Draw seaside elements
-        ground_y = screen_height - screen_height // 3
+    def render_ground(self, tile, left, variant):
+        season, place, tier = variant
+        if place == "farmland":
+            # Draw farms, fields, etc.
+            self.render_farmland(tile, left, tier)
+        elif place == "city":
+            # Draw buildings, roads, etc.
+            self.render_city(tile, left, season, tier)
+        elif place == "seaside":
+            # Draw ocean, beach, etc.
+            self.render_seaside(tile, left, season)
 
-        # Draw ocean
-        ocean_color = (0, 105, 148, int(255 * opacity))
-        ocean_surface = pygame.Surface((screen_width, screen_height // 3), pygame.SRCALPHA)
-        ocean_surface.fill(ocean_color)
-        surface.blit(ocean_surface, (0, ground_y))
+    def render_farmland(self, tile, left, tier):
+        ground_y = self.scenery_height
+        width = tile.get_width()
 
+        # Draw fields with crops (simple rectangles)
+        field_width = 300
+        for field_x in range(left - left % field_width, left + width, field_width):
+            x = field_x - left
+            tile.fill((194, 178, 128), (x, ground_y, field_width, 50))  # Wheat field color
+
+            # Draw crop rows
+            for j in range(tier.crop_rows):
+                tile.fill((139, 115, 85), (x + j * field_width // tier.crop_rows, ground_y, 10, 50))
+
+        # Draw farm houses every 1000 pixels
+        house_spacing = 1000
+        for house_x in range((left - 170) // house_spacing * house_spacing, left + width + 20, house_spacing):
+            x = house_x - left
+
+            # House body
+            tile.fill((255, 0, 0), (x, ground_y - 100, 150, 100))
+
+            # Roof
+            roof_points = ((x - 20, ground_y - 100), (x + 75, ground_y - 150), (x + 170, ground_y - 100))
+            pygame.draw.polygon(tile, (139, 69, 19), roof_points)
+
+    def render_city(self, tile, left, season, tier):
+        ground_y = self.scenery_height
+        width = tile.get_width()
+
+        # The road itself is part of the static layer
+        # Draw road markings
+        marking_width = 50
+        for marking_x in range(left - left % (marking_width * 2), left + width, marking_width * 2):
+            tile.fill((255, 255, 255), (marking_x - left, ground_y + 90, marking_width, 10))
+
+        # Draw buildings from the pre-rendered skyline
+        lighting = "night" if season == "night" else "day"
+        self.skyline.draw(tile, left, ground_y, lighting, window_rows=tier.window_rows)
+
+    def render_seaside(self, tile, left, season):
+        ground_y = self.scenery_height
+        width = tile.get_width()
+
+        # The ocean itself is part of the static layer
         # Draw waves
         wave_spacing = 50
-        num_waves = screen_width // wave_spacing + 2
-
-        for i in range(num_waves):
-            wave_x = i * wave_spacing - camera_offset % wave_spacing
-            wave_height = 10
+        wave_height = 10
+        for wave_x in range(left - left % wave_spacing, left + width, wave_spacing):
+            x = wave_x - left
             wave_points = [
-                (wave_x, ground_y),
-                (wave_x + wave_spacing // 2, ground_y - wave_height),
-                (wave_x + wave_spacing, ground_y)
+                (x, ground_y),
+                (x + wave_spacing // 2, ground_y - wave_height),
+                (x + wave_spacing, ground_y)
             ]
-            wave_color = (173, 216, 230, int(255 * opacity))
-            pygame.draw.lines(surface, wave_color, False, wave_points, 3)
+            pygame.draw.lines(tile, (173, 216, 230), False, wave_points, 3)
 
         # Draw sand
-        sand_color = (194, 178, 128, int(255 * opacity))
-        sand_surface = pygame.Surface((screen_width, 20), pygame.SRCALPHA)
-        sand_surface.fill(sand_color)
-        surface.blit(sand_surface, (0, ground_y - 20))
+        tile.fill((194, 178, 128), (0, ground_y - 20, width, 20))
 
         # Draw boats
         boat_spacing = 800
-        num_boats = 3
-
-        for i in range(num_boats):
-            boat_x = i * boat_spacing - camera_offset % (boat_spacing * num_boats)
+        for boat_x in range((left - 100) // boat_spacing * boat_spacing, left + width, boat_spacing):
+            x = boat_x - left
             boat_y = ground_y + 30
 
             # Boat body
-            boat_points = [
-                (0, 0),
-                (100, 0),
-                (80, 30),
-                (20, 30)
-            ]
-            boat_color = (139, 69, 19, int(255 * opacity))
-            boat_surface = pygame.Surface((100, 30), pygame.SRCALPHA)
-            pygame.draw.polygon(boat_surface, boat_color, boat_points)
-            surface.blit(boat_surface, (boat_x, boat_y))
+            boat_points = ((x, boat_y), (x + 100, boat_y), (x + 80, boat_y + 30), (x + 20, boat_y + 30))
+            pygame.draw.polygon(tile, (139, 69, 19), boat_points)
 
             # Boat sail (only in sunny or night weather)
-            if self.current_season != "rainy":
-                sail_points = [
-                    (0, 0),
-                    (0, -70),
-                    (40, -20)
-                ]
-                sail_color = (255, 255, 255, int(255 * opacity))
-                sail_surface = pygame.Surface((40, 70), pygame.SRCALPHA)
-                pygame.draw.polygon(sail_surface, sail_color, sail_points)
-                surface.blit(sail_surface, (boat_x + 50, boat_y))
+            if season != "rainy":
+                sail_points = ((x + 50, boat_y), (x + 50, boat_y - 70), (x + 90, boat_y - 20))
+                pygame.draw.polygon(tile, (255, 255, 255), sail_points)
 
 
 class Flight(pygame.sprite.Sprite):
@@ -466,42 +506,59 @@ class Flight(pygame.sprite.Sprite):
 
     def __init__(self, x, y, scale, velocity_vertical, velocity_horizontal, is_enemy=False):
         super().__init__()
-        try:
-            if is_enemy:
-                img = pygame.image.load("images/jet_fighter_PNG7.png")
-            else:
-                img = pygame.image.load("images/TempFlightFigure.png")
-            self.image = pygame.transform.scale(img, (int(img.get_width() * scale), int(img.get_height() * scale)))
-        except pygame.error:
-            self.image = pygame.Surface((50, 50))
-            self.image.fill((255, 0, 0) if is_enemy else (0, 0, 255))
-
         if not is_enemy:
             self.max_health = 100
             self.current_health = self.max_health
             self.last_hit_time = 0
             self.distance_traveled = 0  # Track how far player has flown
 
-        self.target_y = y
         self.move_smoothness = 0.1
+        self.speed = velocity_horizontal
+        self.is_enemy = is_enemy
+        self.respawn(x, y, scale, velocity_vertical)
+
+    def respawn(self, x, y, scale, velocity_vertical):
+        """Put the flight back at a new position, reusing this object"""
+        self.sprite_name = ENEMY_SPRITE if self.is_enemy else PLAYER_SPRITE
+        self.sprite_scale = scale
+        try:
+            self.image, self.mask = sprites.get(self.sprite_name, scale)
+        except (pygame.error, FileNotFoundError):
+            self.sprite_name = None
+            self.image = pygame.Surface((50, 50))
+            self.image.fill((255, 0, 0) if self.is_enemy else (0, 0, 255))
+            self.mask = pygame.mask.from_surface(self.image)
+
+        self.target_y = y
         self.rect = self.image.get_rect()
         self.rect.center = (x, y)
         self.altitude = velocity_vertical
-        self.speed = velocity_horizontal
-        self.is_enemy = is_enemy
-        self.direction = random.choice([-1, 1]) if is_enemy else 1
+        self.direction = streams.enemy_ai.choice([-1, 1]) if self.is_enemy else 1
         self.world_x = x
         self.world_y = y
-        self.mask = pygame.mask.from_surface(self.image)
         self.collision_radius = min(self.rect.width, self.rect.height) // 2
         self.collision_center = (self.world_x, self.rect.centery)
         self.vertical_movement_timer = 0
-        self.change_direction_delay = random.randint(60, 180)
+        self.change_direction_delay = streams.enemy_ai.randint(60, 180)
         self.has_been_passed = False
 
-    def draw(self, camera_offset_x=0):
+    def draw(self, camera_offset_x=0, surface=None):
+        if surface is None:
+            surface = screen
+        surface.blit(*self.blit_args(camera_offset_x, surface.get_width() / screen_width))
+
+    def blit_args(self, camera_offset_x=0, scale=1.0):
+        """The image and position to draw the flight with, on a surface scale times the screen's size"""
         display_x = self.world_x - camera_offset_x
-        screen.blit(self.image, (display_x, self.rect.y))
+        if scale == 1.0:
+            return self.image, (display_x, self.rect.y)
+
+        # Below full resolution, draw the sprite at the matching size
+        if self.sprite_name is not None:
+            image = sprites.get(self.sprite_name, self.sprite_scale * scale)[0]
+        else:
+            image = pygame.transform.scale_by(self.image, scale)
+        return image, (round(display_x * scale), round(self.rect.y * scale))
 
     def flight_movement(self, moves_up, moves_down, speed_up, speed_down):
         travel_distance_x = 0
@@ -545,7 +602,7 @@ class Flight(pygame.sprite.Sprite):
         if self.vertical_movement_timer >= self.change_direction_delay:
             self.direction *= -1
             self.vertical_movement_timer = 0
-            self.change_direction_delay = random.randint(max(30, 120 - level * 20), max(60, 180 - level * 30))
+            self.change_direction_delay = streams.enemy_ai.randint(max(30, 120 - level * 20), max(60, 180 - level * 30))
 
         # Faster vertical movement in higher levels
         vertical_speed = self.altitude * 0.5 * (1 + (level - 1) * 0.3)
@@ -575,9 +632,9 @@ class Flight(pygame.sprite.Sprite):
 
     def play_sound(self, is_enemy):
         if not is_enemy:
-            plane_fx.play()
+            audio.loop("engine")
         else:
-            enemy_fx.play()
+            audio.play("enemy_jet")
 
     @classmethod
     def level_begins(cls, level, player_x):
@@ -588,17 +645,19 @@ class Flight(pygame.sprite.Sprite):
 
 
 class LevelManager:
-    def __init__(self):
+    def __init__(self, level_thresholds=None):
         self.current_level = 1
-        self.max_level = 6  # Increased to 6 levels for all combinations
-        self.level_thresholds = {
-            1: 0,  # Starting level
-            2: 1000,  # Threshold to reach level 2
-            3: 2000,  # Threshold to reach level 3
-            4: 3000,  # Threshold to reach level 4
-            5: 4000,  # Threshold to reach level 5
-            6: 5000  # Threshold to reach level 6
-        }
+        if level_thresholds is None:
+            level_thresholds = {
+                1: 0,  # Starting level
+                2: 1000,  # Threshold to reach level 2
+                3: 2000,  # Threshold to reach level 3
+                4: 3000,  # Threshold to reach level 4
+                5: 4000,  # Threshold to reach level 5
+                6: 5000  # Threshold to reach level 6
+            }
+        self.level_thresholds = level_thresholds
+        self.max_level = max(level_thresholds)  # 6 levels for all combinations by default
         self.level_completed = False
         self.level_transition_time = 0
         self.show_transition = False
@@ -606,7 +665,10 @@ class LevelManager:
         self.background_changed = False  # Flag to track background changes
         self.last_level = 1
 
-    def update(self, player_distance, bg_manager):
+    def update(self, player_distance, bg_manager, current_time=None):
+        if current_time is None:
+            current_time = pygame.time.get_ticks()
+
         # Determine the current level based on distance traveled
         old_level = self.current_level
 
@@ -616,9 +678,9 @@ class LevelManager:
                     # Level up!
                     self.current_level = level
                     self.show_transition = True
-                    self.level_transition_time = pygame.time.get_ticks()
+                    self.level_transition_time = current_time
                     self.background_changed = False  # Reset flag for new level
-                    level_up_fx.play()
+                    audio.play("level_up")
                 break
 
         # If level changed or background hasn't been set for this level
@@ -629,7 +691,7 @@ class LevelManager:
 
         # Check if we're showing the transition and if it's time to hide it
         if self.show_transition:
-            if pygame.time.get_ticks() - self.level_transition_time > self.transition_duration:
+            if current_time - self.level_transition_time > self.transition_duration:
                 self.show_transition = False
 
         # Check if we've completed the game
@@ -639,8 +701,7 @@ class LevelManager:
         return self.current_level
 
     def draw_level_info(self, surface):
-        font = pygame.font.SysFont(None, 36)
-        level_text = font.render(f"Level: {self.current_level}", True, (255, 255, 255))
+        level_text = text_cache.render(f"Level: {self.current_level}", (255, 255, 255))
         surface.blit(level_text, (screen_width - 150, 10))
 
         if self.show_transition:
@@ -650,15 +711,13 @@ class LevelManager:
             surface.blit(overlay, (0, 0))
 
             # Display the level transition text
-            big_font = pygame.font.SysFont(None, 72)
-            level_announce = big_font.render(f"LEVEL {self.current_level}", True, (255, 255, 255))
+            level_announce = text_cache.render(f"LEVEL {self.current_level}", (255, 255, 255), 72)
 
             # Center the text
             text_rect = level_announce.get_rect(center=(screen_width / 2, screen_height / 2))
             surface.blit(level_announce, text_rect)
 
             # Add level description
-            desc_font = pygame.font.SysFont(None, 36)
             descriptions = {
                 1: "Sunny day over farmland!",
                 2: "Rainy weather in the city!",
@@ -667,38 +726,40 @@ class LevelManager:
                 5: "Night flight over the city!",
                 6: "Stormy weather at sea!"
             }
-            desc_text = desc_font.render(descriptions.get(self.current_level, ""), True, (255, 255, 255))
+            desc_text = text_cache.render(descriptions.get(self.current_level, ""), (255, 255, 255))
             desc_rect = desc_text.get_rect(center=(screen_width / 2, screen_height / 2 + 60))
             surface.blit(desc_text, desc_rect)
 
             # Add a "Continue" instruction during level transition
-            continue_font = pygame.font.SysFont(None, 28)
-            continue_text = continue_font.render("Keep flying! Game continues automatically", True, (255, 255, 255))
+            continue_text = text_cache.render("Keep flying! Game continues automatically", (255, 255, 255), 28)
             continue_rect = continue_text.get_rect(center=(screen_width / 2, screen_height / 2 + 120))
             surface.blit(continue_text, continue_rect)
 
 
-def spawn_enemy(enemies, player_x, spawn_distance, level):
+def spawn_enemy(enemies, player_x, spawn_distance, level, difficulty=DEFAULT_DIFFICULTY):
     """Spawn new enemies ahead of the player in endless world with level-based difficulty"""
-    x_pos = player_x + spawn_distance + random.randint(100, 300)
-    y_pos = random.randint(100, screen_height - 100)
+    x_pos = player_x + spawn_distance + streams.spawning.randint(100, 300)
+    y_pos = streams.spawning.randint(100, screen_height - 100)
 
     # Adjust enemy attributes based on level
-    scale = 0.3 * (1 + (level - 1) * 0.1)  # Bigger enemies in higher levels
-    vertical_speed = 2 + (level - 1)  # Faster vertical movement in higher levels
+    scale = difficulty.enemy_scale(level)  # Bigger enemies in higher levels
+    vertical_speed = difficulty.enemy_vertical_speed(level)  # Faster vertical movement in higher levels
 
-    new_enemy = Flight(x_pos, y_pos, scale, vertical_speed, 0, is_enemy=True)
+    new_enemy = enemy_pool.acquire(x_pos, y_pos, scale, vertical_speed)
     new_enemy.play_sound(is_enemy=True)
-    enemies.append(new_enemy)
+    enemies.add(new_enemy)
 
 
-def check_collisions(player, enemies):
-    current_time = pygame.time.get_ticks()
+def check_collisions(player, enemies, current_time=None):
+    if current_time is None:
+        current_time = pygame.time.get_ticks()
     damaged = False
 
     player.update_collision_data()
 
-    for enemy in enemies[:]:
+    # Broadphase: only enemies within reach along x can touch the player
+    reach = player.collision_radius + enemies.max_radius
+    for enemy in enemies.overlapping(player.world_x - reach, player.world_x + reach):
         enemy.update_collision_data()
 
         dx = enemy.collision_center[0] - player.collision_center[0]
@@ -715,165 +776,503 @@ def check_collisions(player, enemies):
                     player.current_health -= 10
                     player.last_hit_time = current_time
                     enemies.remove(enemy)
+                    enemy_pool.release(enemy)
                     damaged = True
 
     return damaged
 
 
-# Game initialization
-player_flight = Flight(screen_width // 4, screen_height // 2, 0.3, 5, 5, is_enemy=False)
-enemy_flights = []
-bg_manager = BackgroundManager()
-level_manager = LevelManager()
-game_over = False
-game_completed = False
-score = 0
-font = pygame.font.SysFont(None, 36)
-spawn_timer = 0
-spawn_cooldown = 120  # 2 seconds at 60 FPS
-
-# Initial enemy spawn
-spawn_enemy(enemy_flights, player_flight.world_x, 800, level_manager.current_level)
-
-# Main game loop
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if game_over and event.key == pygame.K_r:
-                # Reset game with random starting background
-                player_flight = Flight(screen_width // 4, screen_height // 2, 0.3, 5, 5, is_enemy=False)
-                enemy_flights = []
-                bg_manager = BackgroundManager()  # This creates a new random background
-                level_manager = LevelManager()
-                game_over = False
-                game_completed = False
-                score = 0
-                spawn_enemy(enemy_flights, player_flight.world_x, 800, level_manager.current_level)
-
-            if game_completed and event.key == pygame.K_r:
-                # Reset game after completion with random starting background
-                player_flight = Flight(screen_width // 4, screen_height // 2, 0.3, 5, 5, is_enemy=False)
-                enemy_flights = []
-                bg_manager = BackgroundManager()  # This creates a new random background
-                level_manager = LevelManager()
-                game_over = False
-                game_completed = False
-                score = 0
-                spawn_enemy(enemy_flights, player_flight.world_x, 800, level_manager.current_level)
-
-    # Get keyboard input regardless of transition state
-    keys = pygame.key.get_pressed()
-    moves_up = keys[pygame.K_UP]
-    moves_down = keys[pygame.K_DOWN]
-    speed_up = keys[pygame.K_RIGHT]
-    speed_down = keys[pygame.K_LEFT]
-
-    if not game_over and not game_completed:
-        # Always play sound and allow movement, even during level transition
-        player_flight.play_sound(is_enemy=False)
-        player_flight.flight_movement(moves_up, moves_down, speed_up, speed_down)
-
-        # Update camera (follow player horizontally)
-        target_x = player_flight.world_x - screen_width // 4
-        camera_offset_x = target_x
-
-    # Always update the level based on distance, even during transition
-    current_level = level_manager.update(score, bg_manager)
-
-    # Enemy spawning with level-based timing
-    spawn_timer += 1
-    spawn_cooldown_for_level = max(30, 120 - current_level * 30)  # Spawn faster in higher levels
-
-    if spawn_timer >= spawn_cooldown_for_level:
-        spawn_enemy(enemy_flights, player_flight.world_x, 800, current_level)
-        spawn_timer = 0
-
-    # Remove enemies that are too far behind
-    for enemy in enemy_flights[:]:
-        if player_flight.world_x - enemy.world_x > screen_width:
-            enemy_flights.remove(enemy)
-
-    # Update player collision data
-    player_flight.update_collision_data()
-
-    # Only handle enemy movement and collisions when not in transition
-    if not level_manager.show_transition:
-        for enemy in enemy_flights:
-            enemy.enemy_movement(player_flight, current_level)
-            enemy.update_collision_data()
-
-        # Check collisions - damage increases with level
-        if check_collisions(player_flight, enemy_flights):
-            if player_flight.current_health <= 0:
-                game_over = True
-            else:
-                current_time = pygame.time.get_ticks()
-                if current_time - player_flight.last_hit_time < 200:
-                    flash_surface = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-                    flash_surface.fill((255, 0, 0, 50))
-                    screen.blit(flash_surface, (0, 0))
-
-    # Update score based on distance traveled
-    score = int(player_flight.distance_traveled / 10)
-
-    # Check if game is completed (passed all levels)
-    if score >= level_manager.level_thresholds[level_manager.max_level] + 1000:
-        game_completed = True
-
-    # Drawing
-    bg_manager.draw(camera_offset_x)
-
-    for enemy in enemy_flights:
-        enemy.draw(camera_offset_x)
-
-    player_flight.draw(camera_offset_x)
-
-    # UI Elements
-    player_flight.draw_health_bar(screen, 10, 50, player_flight.current_health, player_flight.max_health)
-    health_text = font.render(f"{player_flight.current_health}/{player_flight.max_health}", True, (255, 255, 255))
-    screen.blit(health_text, (220, 50))
-
-    score_text = font.render(f"Distance: {score}km", True, (255, 255, 255))
-    screen.blit(score_text, (10, 10))
-
-    # Draw level information
-    level_manager.draw_level_info(screen)
-
-    if game_over:
-        # Create a semi-transparent overlay
-        overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        screen.blit(overlay, (0, 0))
-
-        game_over_text = font.render("GAME OVER! Press R to restart", True, (255, 0, 0))
-        text_rect = game_over_text.get_rect(center=(screen_width // 2, screen_height // 2))
-        screen.blit(game_over_text, text_rect)
-
-    if game_completed:
-        # Create a semi-transparent overlay
-        overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        screen.blit(overlay, (0, 0))
-
-        complete_font = pygame.font.SysFont(None, 72)
-        complete_text = complete_font.render("CONGRATULATIONS!", True, (0, 255, 0))
-        text_rect = complete_text.get_rect(center=(screen_width // 2, screen_height // 2 - 50))
-        screen.blit(complete_text, text_rect)
-
-        stats_text = font.render(f"You completed all {level_manager.max_level} levels with a distance of {score}km!",
-                                True, (255, 255, 255))
-        stats_rect = stats_text.get_rect(center=(screen_width // 2, screen_height // 2 + 20))
-        screen.blit(stats_text, stats_rect)
-
-        restart_text = font.render("Press R to play again", True, (255, 255, 255))
-        restart_rect = restart_text.get_rect(center=(screen_width // 2, screen_height // 2 + 70))
-        screen.blit(restart_text, restart_rect)
-
-    pygame.display.flip()
-    clock.tick(60)
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+# Retired enemies are recycled instead of rebuilt for every spawn
+enemy_pool = EnemyPool(lambda x, y, scale, vertical_speed: Flight(x, y, scale, vertical_speed, 0, is_enemy=True))
+
+# NumPy backend that moves every enemy at once, opt-in with --numpy-enemies
+use_enemy_arrays = False
+
+
+def new_enemy_field():
+    """Create an empty enemy container, vectorised if enabled"""
+    if use_enemy_arrays:
+        return SortedEnemies(EnemyArrays(screen_height, rng=streams.numpy("enemy_ai", "arrays")))
+    return SortedEnemies()
+
+
+class GameSession:
+    """One play-through of the game, advanced a frame at a time by update()"""
+
+    def __init__(self, frame_clock=False, seed=None, difficulty=DEFAULT_DIFFICULTY):
+        # With a frame clock, game time advances exactly one 60 FPS frame per
+        # update, so a session plays out the same however fast it is simulated
+        self.frame_clock = frame_clock
+        self.difficulty = difficulty
+        self.screen_size = (screen_width, screen_height)
+        self.enemy_flights = None
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Start a new game from a session seed, picking a fresh one if none is given"""
+        if self.enemy_flights is not None:
+            enemy_pool.release_all(self.enemy_flights)
+
+        streams.reseed(seed)
+        self.seed = streams.seed
+
+        self.frame = 0
+        self.player_flight = Flight(screen_width // 4, screen_height // 2, 0.3, 5, 5, is_enemy=False)
+        self.enemy_flights = new_enemy_field()
+        self.bg_manager = BackgroundManager()  # This creates a new random background
+        self.level_manager = LevelManager(self.difficulty.level_thresholds())
+        self.game_over = False
+        self.game_completed = False
+        self.score = 0
+        self.current_level = self.level_manager.current_level
+        self.camera_offset_x = 0
+        self.spawn_timer = 0
+        self.hits_taken = 0
+        self.hit_flash = False
+
+        # Initial enemy spawn
+        spawn_enemy(self.enemy_flights, self.player_flight.world_x, 800, self.level_manager.current_level,
+                    self.difficulty)
+
+    def current_time(self):
+        """Game time in milliseconds"""
+        if self.frame_clock:
+            return self.frame * 1000 // 60
+        return pygame.time.get_ticks()
+
+    def update(self, moves_up, moves_down, speed_up, speed_down):
+        """Advance the game by one frame with the given player input"""
+        player_flight = self.player_flight
+        enemy_flights = self.enemy_flights
+        current_time = self.current_time()
+        self.hit_flash = False
+
+        if not self.game_over and not self.game_completed:
+            # Always play sound and allow movement, even during level transition
+            player_flight.play_sound(is_enemy=False)
+            player_flight.flight_movement(moves_up, moves_down, speed_up, speed_down)
+
+            # Update camera (follow player horizontally)
+            target_x = player_flight.world_x - screen_width // 4
+            self.camera_offset_x = target_x
+        profiler.mark("flight_movement")
+
+        # Always update the level based on distance, even during transition
+        current_level = self.level_manager.update(self.score, self.bg_manager, current_time)
+        self.current_level = current_level
+        profiler.mark("level_update")
+
+        # Enemy spawning with level-based timing
+        self.spawn_timer += 1
+        spawn_cooldown_for_level = self.difficulty.spawn_cooldown(current_level)  # Spawn faster in higher levels
+
+        if self.spawn_timer >= spawn_cooldown_for_level:
+            spawn_enemy(enemy_flights, player_flight.world_x, 800, current_level, self.difficulty)
+            self.spawn_timer = 0
+
+        # Remove enemies that are too far behind
+        for enemy in enemy_flights.retire_behind(player_flight.world_x - screen_width):
+            enemy_pool.release(enemy)
+        profiler.mark("spawn_cull")
+
+        # Update player collision data
+        player_flight.update_collision_data()
+
+        # Only handle enemy movement and collisions when not in transition
+        if not self.level_manager.show_transition:
+            enemy_flights.move(player_flight, current_level)
+            for enemy in enemy_flights:
+                enemy.update_collision_data()
+            profiler.mark("enemy_movement")
+
+            # Check collisions - damage increases with level
+            if check_collisions(player_flight, enemy_flights, current_time):
+                self.hits_taken += 1
+                if player_flight.current_health <= 0:
+                    self.game_over = True
+                elif current_time - player_flight.last_hit_time < 200:
+                    self.hit_flash = True
+            profiler.mark("check_collisions")
+
+        # Update score based on distance traveled
+        self.score = int(player_flight.distance_traveled / 10)
+
+        # Check if game is completed (passed all levels)
+        if self.score >= self.level_manager.level_thresholds[self.level_manager.max_level] + 1000:
+            self.game_completed = True
+        if self.game_over or self.game_completed:
+            audio.stop_loop("engine")
+
+        self.frame += 1
+
+    def draw(self):
+        """Render the current frame to the screen"""
+        player_flight = self.player_flight
+        score = self.score
+
+        # The world goes onto a frame at the render resolution, then the HUD
+        # is drawn over it once it has been scaled to the screen
+        world = resolution.begin(screen)
+        self.bg_manager.draw(self.camera_offset_x, world)
+        profiler.mark("background")
+
+        scale = world.get_width() / screen_width
+        # Enemies spawn well ahead of the view, so only the ones in it are drawn
+        for enemy in self.enemy_flights.visible(self.camera_offset_x, screen_width):
+            sprite_queue.add("enemies", *enemy.blit_args(self.camera_offset_x, scale))
+        sprite_queue.add("player", *player_flight.blit_args(self.camera_offset_x, scale))
+        sprite_queue.flush(world)
+        resolution.present(world, screen)
+
+        if self.hit_flash:
+            flash_surface = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+            flash_surface.fill((255, 0, 0, 50))
+            screen.blit(flash_surface, (0, 0))
+        profiler.mark("sprites")
+
+        # UI Elements
+        player_flight.draw_health_bar(screen, 10, 50, player_flight.current_health, player_flight.max_health)
+        health_text = text_cache.render(f"{player_flight.current_health}/{player_flight.max_health}", (255, 255, 255))
+        screen.blit(health_text, (220, 50))
+
+        score_text = text_cache.render(f"Distance: {score}km", (255, 255, 255))
+        screen.blit(score_text, (10, 10))
+
+        # Draw level information
+        self.level_manager.draw_level_info(screen)
+
+        if self.game_over:
+            # Create a semi-transparent overlay
+            overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 128))
+            screen.blit(overlay, (0, 0))
+
+            game_over_text = text_cache.render("GAME OVER! Press R to restart", (255, 0, 0))
+            text_rect = game_over_text.get_rect(center=(screen_width // 2, screen_height // 2))
+            screen.blit(game_over_text, text_rect)
+
+        if self.game_completed:
+            # Create a semi-transparent overlay
+            overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 128))
+            screen.blit(overlay, (0, 0))
+
+            complete_text = text_cache.render("CONGRATULATIONS!", (0, 255, 0), 72)
+            text_rect = complete_text.get_rect(center=(screen_width // 2, screen_height // 2 - 50))
+            screen.blit(complete_text, text_rect)
+
+            stats_text = text_cache.render(
+                f"You completed all {self.level_manager.max_level} levels with a distance of {score}km!", (255, 255, 255))
+            stats_rect = stats_text.get_rect(center=(screen_width // 2, screen_height // 2 + 20))
+            screen.blit(stats_text, stats_rect)
+
+            restart_text = text_cache.render("Press R to play again", (255, 255, 255))
+            restart_rect = restart_text.get_rect(center=(screen_width // 2, screen_height // 2 + 70))
+            screen.blit(restart_text, restart_rect)
+
+        profiler.draw_overlay(screen, fonts.get(14, "monospace"))
+        profiler.mark("hud")
+
+    def is_finished(self):
+        return self.game_over or self.game_completed
+
+    def summary(self):
+        return {
+            "seed": self.seed,
+            "frames": self.frame,
+            "distance": self.score,
+            "level": self.current_level,
+            "health": self.player_flight.current_health,
+            "hits_taken": self.hits_taken,
+            "game_over": self.game_over,
+            "completed": self.game_completed
+        }
+
+
+def init(headless=False, fullscreen=False, sound=True):
+    """Open the window and the mixer, and start loading assets in the background.
+
+    Headless, both go to SDL's dummy drivers. Full screen, the screen keeps
+    its logical size and the graphics card stretches it over the display.
+    Without sound, the mixer stays closed and every sound is silent.
+    """
+    global screen
+    if headless:
+        engine.use_dummy_drivers()
+    engine.init_fonts()
+    if sound and engine.init_mixer():
+        audio.open()
+    flags = pygame.SCALED | pygame.FULLSCREEN if fullscreen else 0
+    screen = engine.init_display((screen_width, screen_height), "Endless Flight Game", flags)
+    engine.init_remaining(mixer=sound)
+    assets.start()
+
+
+def show_loading_screen():
+    """Show a progress bar until the assets needed for the first frame are in"""
+    while assets.essential_progress() < 1.0:
+        if pygame.event.peek(pygame.QUIT):
+            return False
+        pygame.event.pump()
+
+        screen.fill((0, 0, 0))
+        bar = pygame.Rect(screen_width // 4, screen_height // 2, screen_width // 2, 20)
+        pygame.draw.rect(screen, (255, 255, 255), (bar.x, bar.y, bar.width * assets.essential_progress(), bar.height))
+        pygame.draw.rect(screen, (255, 255, 255), bar, 2)
+        loading_text = text_cache.render("Loading...", (255, 255, 255))
+        screen.blit(loading_text, loading_text.get_rect(center=(screen_width // 2, screen_height // 2 - 30)))
+
+        pygame.display.flip()
+        startup.frame_shown("first frame (loading screen)")
+        clock.tick(60)
+    return True
+
+
+def run(seed=None, recording=None, profile_startup=False):
+    """Play the game in the window until it is closed, optionally recording the input"""
+    if not show_loading_screen():
+        return
+
+    # The frame clock keeps a recorded game reproducible frame for frame
+    session = GameSession(frame_clock=True, seed=seed)
+    if recording is not None:
+        recording.start(session.seed)
+
+    # Main game loop
+    running = True
+    while running:
+        frame_start = time.perf_counter()
+        surface_pool.begin_frame()
+        profiler.begin_frame()
+        profiler.counter("surface allocs", surface_pool.last_frame_allocations)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                if session.is_finished() and event.key == pygame.K_r:
+                    # Reset game with random starting background
+                    if recording is not None:
+                        recording.finish(session.score, session.player_flight.current_health)
+                    session.reset()
+                    if recording is not None:
+                        recording.start(session.seed)
+
+        # Get keyboard input regardless of transition state
+        keys = pygame.key.get_pressed()
+        frame_input = (keys[pygame.K_UP], keys[pygame.K_DOWN], keys[pygame.K_RIGHT], keys[pygame.K_LEFT])
+        if recording is not None:
+            recording.record(*frame_input)
+        profiler.mark("events")
+        session.update(*frame_input)
+        audio.sample()
+
+        # Drawing
+        session.draw()
+        pygame.display.flip()
+        profiler.mark("flip")
+        profiler.end_frame()
+        # Judge detail and resolution by the work done, not the wait for the next frame
+        frame_time = time.perf_counter() - frame_start
+        quality.adapt(frame_time)
+        resolution.adapt(frame_time)
+        profiler.counter("quality", quality.tier.name)
+        profiler.counter("render scale", resolution.scale)
+        if profile_startup and "first game frame" not in startup.frames:
+            startup.frame_shown("first game frame")
+            print("\n".join(startup.report(assets)))
+        clock.tick(60)
+
+    if recording is not None:
+        recording.finish(session.score, session.player_flight.current_health)
+
+
+def run_headless(policy, max_frames, sessions=1, render_every=0, seed=None, recording=None,
+                 difficulty=DEFAULT_DIFFICULTY):
+    """Simulate sessions without a frame cap, driven by a scripted policy.
+
+    Each session runs until the game is over, completed, or max_frames have
+    passed. Only every render_every-th frame is drawn (never when 0). Given a
+    seed, session i is seeded with seed + i so runs are reproducible. Returns
+    the session summaries and the simulated frames per second.
+    """
+    assets.wait()
+    results = []
+    total_frames = 0
+    start = time.perf_counter()
+    session = None
+
+    for i in range(sessions):
+        session_seed = None if seed is None else seed + i
+        if session is None:
+            session = GameSession(frame_clock=True, seed=session_seed, difficulty=difficulty)
+        else:
+            session.reset(session_seed)
+        if recording is not None:
+            recording.start(session.seed)
+
+        while session.frame < max_frames and not session.is_finished():
+            surface_pool.begin_frame()
+            profiler.begin_frame()
+            profiler.counter("surface allocs", surface_pool.last_frame_allocations)
+            frame_input = policy(session)
+            if recording is not None:
+                recording.record(*frame_input)
+            profiler.mark("events")
+            session.update(*frame_input)
+            audio.sample()
+            if render_every and session.frame % render_every == 0:
+                session.draw()
+                pygame.display.flip()
+                profiler.mark("flip")
+            profiler.end_frame()
+
+        if recording is not None:
+            recording.finish(session.score, session.player_flight.current_health)
+        total_frames += session.frame
+        results.append(session.summary())
+
+    elapsed = time.perf_counter() - start
+    return results, total_frames / elapsed if elapsed > 0 else 0.0
+
+
+def run_replay(recording, render=True):
+    """Play a recording back and check every game against its recorded outcome.
+
+    With render=False the replay fast-forwards without drawing or a frame cap.
+    Returns the session summaries and the simulated frames per second.
+    """
+    global use_enemy_arrays
+    use_enemy_arrays = bool(recording.flags & replay.NUMPY_ENEMIES)
+
+    assets.wait()
+    results = []
+    total_frames = 0
+    start = time.perf_counter()
+    session = None
+
+    for segment in recording.segments:
+        if session is None:
+            session = GameSession(frame_clock=True, seed=segment.seed)
+        else:
+            session.reset(segment.seed)
+
+        for frame_input in segment.inputs():
+            surface_pool.begin_frame()
+            profiler.begin_frame()
+            profiler.counter("surface allocs", surface_pool.last_frame_allocations)
+            if render:
+                if pygame.event.peek(pygame.QUIT):
+                    return results, 0.0
+                pygame.event.pump()
+            profiler.mark("events")
+            session.update(*frame_input)
+            audio.sample()
+            if render:
+                session.draw()
+                pygame.display.flip()
+                profiler.mark("flip")
+            profiler.end_frame()
+            if render:
+                clock.tick(60)
+
+        summary = session.summary()
+        summary["matches_recording"] = segment.outcome == (session.score, session.player_flight.current_health)
+        total_frames += session.frame
+        results.append(summary)
+
+    elapsed = time.perf_counter() - start
+    return results, total_frames / elapsed if elapsed > 0 else 0.0
+
+
+def print_results(results, fps):
+    for i, result in enumerate(results, 1):
+        print(f"session {i}: " + ", ".join(f"{key}={value}" for key, value in result.items()))
+    print(f"simulated {sum(r['frames'] for r in results)} frames at {fps:.0f} FPS")
+
+
+def main():
+    global use_enemy_arrays
+
+    parser = argparse.ArgumentParser(description="Endless Flight Game")
+    parser.add_argument("--numpy-enemies", action="store_true", help="move enemies with the NumPy backend")
+    parser.add_argument("--headless", action="store_true",
+                        help="simulate without a window or frame cap (fast-forwards a --replay)")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="dodge", help="scripted pilot for --headless")
+    parser.add_argument("--frames", type=int, default=60 * 60 * 10, help="frame limit per headless session")
+    parser.add_argument("--sessions", type=int, default=1, help="number of headless sessions")
+    parser.add_argument("--seed", type=int, help="session seed for reproducible runs")
+    parser.add_argument("--render-every", type=int, default=0, help="draw every Nth headless frame (0 = never)")
+    parser.add_argument("--record", metavar="FILE", help="record every game's input to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recording made with --record")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every frame phase; shows the overlay (toggle with F3) or prints a report")
+    parser.add_argument("--trace", metavar="FILE", help="write per-phase Chrome trace events to FILE")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report the time spent on each startup step and asset up to the first frame")
+    parser.add_argument("--audio-report", action="store_true", help="print mixer channel utilisation on exit")
+    parser.add_argument("--render-scale", type=float, choices=RenderResolution.SCALES, default=1.0,
+                        help="draw the world at this fraction of the screen resolution")
+    parser.add_argument("--adaptive-resolution", action="store_true",
+                        help="lower the render scale while frames run over budget, and raise it with headroom")
+    parser.add_argument("--fullscreen", action="store_true", help="stretch the game over the whole display")
+    parser.add_argument("--quality", choices=["auto", "high", "medium", "low"], default="auto",
+                        help="scenery and weather detail; auto adapts it to the frame rate in the window")
+    args = parser.parse_args()
+
+    playback = None
+    if args.replay:
+        try:
+            playback = replay.Recording.load(args.replay)
+        except (OSError, replay.ReplayError) as e:
+            parser.error(f"can't replay {args.replay}: {e}")
+
+    if args.profile or args.trace:
+        profiler.start(overlay=args.profile and not args.headless, trace=bool(args.trace))
+
+    init(headless=args.headless, fullscreen=args.fullscreen and not args.headless)
+    resolution.set_scale(args.render_scale)
+    resolution.adaptive = args.adaptive_resolution
+    if args.quality == "auto":
+        quality.adaptive = not args.headless
+    else:
+        quality.set_tier(args.quality)
+    if args.audio_report:
+        audio.start_report()
+
+    use_enemy_arrays = args.numpy_enemies
+    recording = None
+    if args.record:
+        recording = replay.Recording(flags=replay.NUMPY_ENEMIES if use_enemy_arrays else 0)
+
+    if playback is not None:
+        print_results(*run_replay(playback, render=not args.headless))
+    elif args.headless:
+        print_results(*run_headless(POLICIES[args.policy], args.frames, args.sessions, args.render_every,
+                                    args.seed, recording))
+    else:
+        run(args.seed, recording, args.profile_startup)
+
+    if recording is not None:
+        recording.save(args.record)
+    if args.profile and args.headless:
+        print("\n".join(profiler.report()))
+    if args.profile:
+        print("enemy pool: " + ", ".join(f"{name} {value}" for name, value in enemy_pool.stats().items()))
+        print("quality: " + ", ".join(f"{name} {value:.2f}" if isinstance(value, float) else f"{name} {value}"
+                                      for name, value in quality.telemetry().items()))
+    if args.profile_startup and (args.headless or args.replay):
+        print("\n".join(startup.report(assets)))
+    if args.trace:
+        profiler.save_trace(args.trace)
+    if args.audio_report:
+        print("\n".join(audio.report()))
+
+    pygame.quit()
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,37 +2,37 @@ import pygame
 import random
 import sys
 from pygame import mixer
+from audio import AudioManager
+import engine
+from render_cache import FontRegistry, TextCache
+from weather import RainParticles, StarParticles, rain_streak_sprites
 
 
-# Pygame setup
-pygame.init()
-pygame.mixer.init()
+# The window is opened by init()
 screen_width, screen_height = 1280, 720
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Endless Flight Game")
+screen = None
 clock = pygame.time.Clock()
 
-# Defined audios
-try:
-    plane_fx = pygame.mixer.Sound('audio/commercial-aircraft-in-flight-sounds-17309.wav')
-    plane_fx.set_volume(0.5)
-    enemy_fx = pygame.mixer.Sound('audio/jetSound.wav')
-    enemy_fx.set_volume(0.3)
-    level_up_fx = pygame.mixer.Sound('audio/Levelup-sound.wav')
-    level_up_fx.set_volume(0.7)
-except:
-    # Create dummy sound objects if files aren't found
-    plane_fx = pygame.mixer.Sound(buffer=bytearray(100))
-    enemy_fx = pygame.mixer.Sound(buffer=bytearray(100))
-    level_up_fx = pygame.mixer.Sound(buffer=bytearray(100))
+# Defined audios, loaded by init()
+sounds = {}
 
-# Define camera offset
-camera_offset_x = 0
+# The engine loops on a reserved channel; effects share the other channels
+audio = AudioManager(sounds.get)
+audio.configure("enemy_jet", limit=4, priority=0)
+audio.configure("level_up", limit=1, priority=1)
+
+# Fonts are loaded once and rendered text is reused until it changes
+fonts = FontRegistry()
+text_cache = TextCache(fonts)
 
 
 class BackgroundManager:
+    # Particle counts
+    rain_count = 200
+    star_count = 100
+
     def __init__(self):
-        # Load background images for each season and location combination
+        # Background images for each season and location combination, built when first shown
         self.background_images = {}
         self.current_season = "sunny"
         self.current_location = "farmland"
@@ -48,49 +48,8 @@ class BackgroundManager:
         self.border_transparent = 50
         self.border_color = (255, 255, 255)
 
-
-        # Create placeholder surfaces for each combination
-        for season in ["sunny", "rainy", "night"]:
-            for location in ["farmland", "city", "hill_country", "seaside"]:
-                # In a real game, you would load actual images here
-                # For this example, we'll create colored surfaces with text
-                bg_surface = pygame.Surface((screen_width, screen_height))
-                bg_surface.fill(self.season_colors[season])
-
-                # Add text to identify the background
-                font = pygame.font.SysFont(None, 48)
-                text = font.render(f"{season.capitalize()} - {location.replace('_', ' ').title()}", True,
-                                   (255, 255, 255))
-                text_rect = text.get_rect(center=(screen_width // 2, screen_height // 2))
-                bg_surface.blit(text, text_rect)
-
-                # Add location-specific elements
-                if location == "farmland":
-                    # Draw simple farmland elements
-                    pygame.draw.rect(bg_surface, (34, 139, 34),
-                                     (0, screen_height - 200, screen_width, 200))  # Green fields
-                    pygame.draw.rect(bg_surface, (139, 69, 19), (300, screen_height - 220, 100, 20))  # Brown barn
-                elif location == "city":
-                    # Draw simple city skyline
-                    for i in range(5):
-                        x = 200 + i * 200
-                        height = random.randint(100, 300)
-                        pygame.draw.rect(bg_surface, (105, 105, 105),
-                                         (x, screen_height - height, 80, height))  # Buildings
-                elif location == "hill_country":
-                    # Draw hills
-                    pygame.draw.arc(bg_surface, (0, 100, 0),
-                                    (0, screen_height - 300, 600, 600),
-                                    0, 3.14, width=0)  # Green hill
-                elif location == "seaside":
-                    # Draw sea and beach
-                    pygame.draw.rect(bg_surface, (0, 105, 148), (0, screen_height - 150, screen_width, 150))  # Sea
-                    pygame.draw.rect(bg_surface, (238, 214, 175), (0, screen_height - 170, screen_width, 20))  # Sand
-
-                self.background_images[(season, location)] = bg_surface
-
         # Current background
-        self.current_bg = self.background_images[(self.current_season, self.current_location)]
+        self.current_bg = self.get_background(self.current_season, self.current_location)
 
         # Level to season/location mapping
         self.level_mapping = {
@@ -103,21 +62,70 @@ class BackgroundManager:
         }
 
         # Weather effects
-        self.rain_particles = []
-        self.star_particles = []
+        self.rain_particles = None
+        self.star_particles = None
+        self.rain_sprites = rain_streak_sprites()
+        self.star_sprites = StarParticles.star_sprites()
         self.last_weather_update = 0
         self.weather_cooldown = 50  # ms
 
+    def get_background(self, season, location):
+        """The background for a season and location, created the first time it is needed"""
+        bg_surface = self.background_images.get((season, location))
+        if bg_surface is not None:
+            return bg_surface
+
+        # In a real game, you would load actual images here
+        # For this example, we'll create colored surfaces with text
+        bg_surface = pygame.Surface((screen_width, screen_height))
+        bg_surface.fill(self.season_colors[season])
+
+        # Add text to identify the background
+        font = fonts.get(48)
+        text = font.render(f"{season.capitalize()} - {location.replace('_', ' ').title()}", True,
+                           (255, 255, 255))
+        text_rect = text.get_rect(center=(screen_width // 2, screen_height // 2))
+        bg_surface.blit(text, text_rect)
+
+        # Add location-specific elements
+        if location == "farmland":
+            # Draw simple farmland elements
+            pygame.draw.rect(bg_surface, (34, 139, 34),
+                             (0, screen_height - 200, screen_width, 200))  # Green fields
+            pygame.draw.rect(bg_surface, (139, 69, 19), (300, screen_height - 220, 100, 20))  # Brown barn
+        elif location == "city":
+            # Draw simple city skyline
+            for i in range(5):
+                x = 200 + i * 200
+                height = random.randint(100, 300)
+                pygame.draw.rect(bg_surface, (105, 105, 105),
+                                 (x, screen_height - height, 80, height))  # Buildings
+        elif location == "hill_country":
+            # Draw hills
+            pygame.draw.arc(bg_surface, (0, 100, 0),
+                            (0, screen_height - 300, 600, 600),
+                            0, 3.14, width=0)  # Green hill
+        elif location == "seaside":
+            # Draw sea and beach
+            pygame.draw.rect(bg_surface, (0, 105, 148), (0, screen_height - 150, screen_width, 150))  # Sea
+            pygame.draw.rect(bg_surface, (238, 214, 175), (0, screen_height - 170, screen_width, 20))  # Sand
+
+        self.background_images[(season, location)] = bg_surface
+        return bg_surface
+
     def set_background_for_level(self, level):
         if level in self.level_mapping:
             season, location = self.level_mapping[level]
+            # Keep the running weather unless the environment actually changes
+            if (season, location) == (self.current_season, self.current_location):
+                return
             self.current_season = season
             self.current_location = location
-            self.current_bg = self.background_images[(season, location)]
+            self.current_bg = self.get_background(season, location)
 
             # Reset weather effects
-            self.rain_particles = []
-            self.star_particles = []
+            self.rain_particles = None
+            self.star_particles = None
 
             # Initialize weather effects
             if season == "rainy":
@@ -142,42 +150,27 @@ class BackgroundManager:
         surface.blit(border_surface, (0, 0))
 
     def _init_rain(self):
-        # Create rain particles
-        for _ in range(200):
-            x = random.randint(0, screen_width)
-            y = random.randint(-screen_height, 0)
-            speed = random.uniform(5, 15)
-            self.rain_particles.append([x, y, speed])
+        # Create rain particles, each drawn with the streak for its speed
+        self.rain_particles = RainParticles(self.rain_count, screen_width, screen_height,
+                                            spawn_y=(-screen_height, 0), respawn_y=(-100, 0), steady=True)
+        self.rain_particles.sprite[:] = self.rain_particles.speed.round().astype(int) - 5
 
     def _init_stars(self):
         # Create stars
-        for _ in range(100):
-            x = random.randint(0, screen_width)
-            y = random.randint(0, screen_height // 2)
-            size = random.randint(1, 3)
-            brightness = random.randint(150, 255)
-            self.star_particles.append([x, y, size, brightness])
+        self.star_particles = StarParticles(self.star_count, screen_width, screen_height // 2)
 
     def update_weather(self):
         current_time = pygame.time.get_ticks()
         if current_time - self.last_weather_update > self.weather_cooldown:
             self.last_weather_update = current_time
 
-            if self.current_season == "rainy":
-                # Update rain particles
-                for i, particle in enumerate(self.rain_particles):
-                    particle[1] += particle[2]  # Move down
-                    if particle[1] > screen_height:
-                        # Reset particle at top
-                        self.rain_particles[i][0] = random.randint(0, screen_width)
-                        self.rain_particles[i][1] = random.randint(-100, 0)
+            if self.current_season == "rainy" and self.rain_particles is not None:
+                # Move rain down, resetting fallen drops at the top
+                self.rain_particles.update()
 
-            elif self.current_season == "night":
+            elif self.current_season == "night" and self.star_particles is not None:
                 # Make stars twinkle
-                for i, star in enumerate(self.star_particles):
-                    # Randomly adjust brightness
-                    self.star_particles[i][3] += random.randint(-20, 20)
-                    self.star_particles[i][3] = max(100, min(255, self.star_particles[i][3]))
+                self.star_particles.twinkle()
 
     def draw(self, camera_offset):
         # Draw repeating background for endless effect
@@ -187,28 +180,21 @@ class BackgroundManager:
             screen.blit(self.current_bg, (i * bg_width - camera_offset % bg_width, 0))
 
         # Draw weather effects
-        if self.current_season == "rainy":
+        if self.current_season == "rainy" and self.rain_particles is not None:
             self._draw_rain(camera_offset)
-        elif self.current_season == "night":
+        elif self.current_season == "night" and self.star_particles is not None:
             self._draw_stars(camera_offset)
 
         # Add the transparent border drawing
         self.draw_transparent_border(screen)
 
     def _draw_rain(self, camera_offset):
-        for x, y, speed in self.rain_particles:
-            # Adjust for camera offset
-            display_x = (x - camera_offset) % screen_width
-            pygame.draw.line(screen, (200, 200, 255),
-                             (display_x, y),
-                             (display_x - speed * 0.5, y + speed * 0.5), 1)
+        # Adjust for camera offset
+        self.rain_particles.draw(screen, self.rain_sprites, camera_offset, screen_width)
 
     def _draw_stars(self, camera_offset):
-        for x, y, size, brightness in self.star_particles:
-            # Adjust for camera offset
-            display_x = (x - camera_offset) % screen_width
-            color = (brightness, brightness, brightness)
-            pygame.draw.circle(screen, color, (display_x, y), size)
+        # Adjust for camera offset
+        self.star_particles.draw(screen, self.star_sprites, camera_offset, screen_width)
 
 
 class Flight(pygame.sprite.Sprite):
@@ -335,9 +321,9 @@ class Flight(pygame.sprite.Sprite):
 
     def play_sound(self, is_enemy):
         if not is_enemy:
-            plane_fx.play()
+            audio.loop("engine")
         else:
-            enemy_fx.play()
+            audio.play("enemy_jet")
 
     @classmethod
     def level_begins(cls, level, player_x):
@@ -373,7 +359,7 @@ class LevelManager:
                     self.current_level = level
                     self.show_transition = True
                     self.level_transition_time = pygame.time.get_ticks()
-                    level_up_fx.play()
+                    audio.play("level_up")
                 break
 
         # Check if we're showing the transition and if it's time to hide it
@@ -388,8 +374,7 @@ class LevelManager:
         return self.current_level
 
     def draw_level_info(self, surface):
-        font = pygame.font.SysFont(None, 36)
-        level_text = font.render(f"Level: {self.current_level}", True, (255, 255, 255))
+        level_text = text_cache.render(f"Level: {self.current_level}", (255, 255, 255))
         surface.blit(level_text, (screen_width - 150, 10))
 
         if self.show_transition:
@@ -399,15 +384,13 @@ class LevelManager:
             surface.blit(overlay, (0, 0))
 
             # Display the level transition text
-            big_font = pygame.font.SysFont(None, 72)
-            level_announce = big_font.render(f"LEVEL {self.current_level}", True, (255, 255, 255))
+            level_announce = text_cache.render(f"LEVEL {self.current_level}", (255, 255, 255), 72)
 
             # Center the text
             text_rect = level_announce.get_rect(center=(screen_width / 2, screen_height / 2))
             surface.blit(level_announce, text_rect)
 
             # Add level description
-            desc_font = pygame.font.SysFont(None, 36)
             descriptions = {
                 1: "Clear skies over farmland!",
                 2: "Approaching the city!",
@@ -416,13 +399,12 @@ class LevelManager:
                 5: "Night flight over hills!",
                 6: "Seaside at night!"
             }
-            desc_text = desc_font.render(descriptions.get(self.current_level, ""), True, (255, 255, 255))
+            desc_text = text_cache.render(descriptions.get(self.current_level, ""), (255, 255, 255))
             desc_rect = desc_text.get_rect(center=(screen_width / 2, screen_height / 2 + 60))
             surface.blit(desc_text, desc_rect)
 
             # Add a "Continue" instruction during level transition
-            continue_font = pygame.font.SysFont(None, 28)
-            continue_text = continue_font.render("Keep flying! Game continues automatically", True, (255, 255, 255))
+            continue_text = text_cache.render("Keep flying! Game continues automatically", (255, 255, 255), 28)
             continue_rect = continue_text.get_rect(center=(screen_width / 2, screen_height / 2 + 120))
             surface.blit(continue_text, continue_rect)
 
@@ -468,171 +450,207 @@ def check_collisions(player, enemies):
     return damaged
 
 
-# Game initialization
-player_flight = Flight(screen_width // 4, screen_height // 2, 0.3, 5, 5, is_enemy=False)
-enemy_flights = []
-bg_manager = BackgroundManager()
-level_manager = LevelManager()
-game_over = False
-game_completed = False
-score = 0
-font = pygame.font.SysFont(None, 36)
-spawn_timer = 0
-spawn_cooldown = 120  # 2 seconds at 60 FPS
-
-# Initial enemy spawn
-spawn_enemy(enemy_flights, player_flight.world_x, 800, level_manager.current_level)
-
-# Main game loop
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if game_over and event.key == pygame.K_r:
-                # Reset game
-                player_flight = Flight(screen_width // 4, screen_height // 2, 0.3, 5, 5, is_enemy=False)
-                enemy_flights = []
-                game_over = False
-                game_completed = False
-                score = 0
-                level_manager = LevelManager()
-                bg_manager = BackgroundManager()
-                spawn_enemy(enemy_flights, player_flight.world_x, 800, level_manager.current_level)
-
-            if game_completed and event.key == pygame.K_r:
-                # Reset game after completion
-                player_flight = Flight(screen_width // 4, screen_height // 2, 0.3, 5, 5, is_enemy=False)
-                enemy_flights = []
-                game_over = False
-                game_completed = False
-                score = 0
-                level_manager = LevelManager()
-                bg_manager = BackgroundManager()
-                spawn_enemy(enemy_flights, player_flight.world_x, 800, level_manager.current_level)
-
-    # Get keyboard input regardless of transition state
-    keys = pygame.key.get_pressed()
-    moves_up = keys[pygame.K_UP]
-    moves_down = keys[pygame.K_DOWN]
-    speed_up = keys[pygame.K_RIGHT]
-    speed_down = keys[pygame.K_LEFT]
-
-    if not game_over and not game_completed:
-        # Always play sound and allow movement, even during level transition
-        player_flight.play_sound(is_enemy=False)
-        player_flight.flight_movement(moves_up, moves_down, speed_up, speed_down)
-
-        # Update camera (follow player horizontally)
-        target_x = player_flight.world_x - screen_width // 4
-        camera_offset_x = target_x
-
-    # Update weather effects
-    bg_manager.update_weather()
-
-    # Update level and background
-    current_level = level_manager.update(player_flight.distance_traveled)
-    bg_manager.set_background_for_level(current_level)
-
-    # Only spawn enemies and handle enemy-related logic when not in transition
-    if not level_manager.show_transition and not game_over and not game_completed:
-        # Enemy spawning with level-based timing
-        spawn_timer += 1
-        spawn_cooldown_for_level = max(30, 120 - current_level * 30)  # Spawn faster in higher levels
-
-        if spawn_timer >= spawn_cooldown_for_level:
-            spawn_enemy(enemy_flights, player_flight.world_x, 800, current_level)
-            spawn_timer = 0
-
-        # Remove enemies that are too far behind (do this even during transition)
-        for enemy in enemy_flights[:]:
-            if player_flight.world_x - enemy.world_x > screen_width:
-                enemy_flights.remove(enemy)
-
-        # Always update player collision data
-        player_flight.update_collision_data()
-
-        # Only handle enemy movement and collisions when not in transition
-        if not level_manager.show_transition:
-            for enemy in enemy_flights:
-                enemy.enemy_movement(player_flight, current_level)
-                enemy.update_collision_data()
-
-            # Check collisions - damage increases with level
-            if check_collisions(player_flight, enemy_flights):
-                if player_flight.current_health <= 0:
-                    game_over = True
-                else:
-                    current_time = pygame.time.get_ticks()
-                    if current_time - player_flight.last_hit_time < 200:
-                        flash_surface = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-                        flash_surface.fill((255, 0, 0, 50))
-                        screen.blit(flash_surface, (0, 0))
-
-        # Update score based on distance traveled
-        score = int(player_flight.distance_traveled / 10)
-
-        # Check if game is completed (passed all levels)
-        if score >= 26000:
-            game_completed = True
-
-    # Drawing
-    bg_manager.draw(camera_offset_x)
-
-    for enemy in enemy_flights:
-        enemy.draw(camera_offset_x)
-
-    player_flight.draw(camera_offset_x)
-
-    # UI Elements
-    player_flight.draw_health_bar(screen, 10, 50, player_flight.current_health, player_flight.max_health)
-    health_text = font.render(f"{player_flight.current_health}/{player_flight.max_health}", True, (255, 255, 255))
-    screen.blit(health_text, (220, 50))
-
-    score_text = font.render(f"Distance: {score}km", True, (255, 255, 255))
-    screen.blit(score_text, (10, 10))
-
-    # Draw level information with season and location
-    level_info = font.render(
-        f"Level: {current_level} | {bg_manager.current_season.capitalize()} | {bg_manager.current_location.replace('_', ' ').title()}",
-        True, (255, 255, 255))
-    screen.blit(level_info, (screen_width - 450, 10))
-
-    level_manager.draw_level_info(screen)
-
-    if game_over:
-        # Create a semi-transparent overlay
-        overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        screen.blit(overlay, (0, 0))
-
-        game_over_text = font.render("GAME OVER! Press R to restart", True, (255, 0, 0))
-        text_rect = game_over_text.get_rect(center=(screen_width // 2, screen_height // 2))
-        screen.blit(game_over_text, text_rect)
-
-    if game_completed:
-        # Create a semi-transparent overlay
-        overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        screen.blit(overlay, (0, 0))
-
-        complete_font = pygame.font.SysFont(None, 72)
-        complete_text = complete_font.render("CONGRATULATIONS!", True, (0, 255, 0))
-        text_rect = complete_text.get_rect(center=(screen_width // 2, screen_height // 2 - 50))
-        screen.blit(complete_text, text_rect)
-
-        stats_text = font.render(f"You completed all {level_manager.max_level} levels with a distance of {score}km!",
-                                 True, (255, 255, 255))
-        stats_rect = stats_text.get_rect(center=(screen_width // 2, screen_height // 2 + 20))
-        screen.blit(stats_text, stats_rect)
-
-        restart_text = font.render("Press R to play again", True, (255, 255, 255))
-        restart_rect = restart_text.get_rect(center=(screen_width // 2, screen_height // 2 + 70))
-        screen.blit(restart_text, restart_rect)
-
-    pygame.display.flip()
-    clock.tick(60)
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+def init(headless=False, sound=True):
+    """Start pygame, open the window and load the sounds, unless the mixer is to stay closed"""
+    global screen
+    if headless:
+        engine.use_dummy_drivers()
+    engine.init_fonts()
+    if sound and engine.init_mixer():
+        try:
+            plane_fx = pygame.mixer.Sound('audio/commercial-aircraft-in-flight-sounds-17309.wav')
+            plane_fx.set_volume(0.5)
+            enemy_fx = pygame.mixer.Sound('audio/jetSound.wav')
+            enemy_fx.set_volume(0.3)
+            level_up_fx = pygame.mixer.Sound('audio/Levelup-sound.wav')
+            level_up_fx.set_volume(0.7)
+        except:
+            # Create dummy sound objects if files aren't found
+            plane_fx = pygame.mixer.Sound(buffer=bytearray(100))
+            enemy_fx = pygame.mixer.Sound(buffer=bytearray(100))
+            level_up_fx = pygame.mixer.Sound(buffer=bytearray(100))
+        sounds.update({"engine": plane_fx, "enemy_jet": enemy_fx, "level_up": level_up_fx})
+        audio.open()
+    screen = engine.init_display((screen_width, screen_height), "Endless Flight Game")
+    engine.init_remaining(mixer=sound)
+
+
+def run():
+    """Play the game in the window until it is closed"""
+    # Game initialization
+    camera_offset_x = 0  # Define camera offset
+    player_flight = Flight(screen_width // 4, screen_height // 2, 0.3, 5, 5, is_enemy=False)
+    enemy_flights = []
+    bg_manager = BackgroundManager()
+    level_manager = LevelManager()
+    game_over = False
+    game_completed = False
+    score = 0
+    spawn_timer = 0
+    spawn_cooldown = 120  # 2 seconds at 60 FPS
+
+    # Initial enemy spawn
+    spawn_enemy(enemy_flights, player_flight.world_x, 800, level_manager.current_level)
+
+    # Main game loop
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if game_over and event.key == pygame.K_r:
+                    # Reset game
+                    player_flight = Flight(screen_width // 4, screen_height // 2, 0.3, 5, 5, is_enemy=False)
+                    enemy_flights = []
+                    game_over = False
+                    game_completed = False
+                    score = 0
+                    level_manager = LevelManager()
+                    bg_manager = BackgroundManager()
+                    spawn_enemy(enemy_flights, player_flight.world_x, 800, level_manager.current_level)
+
+                if game_completed and event.key == pygame.K_r:
+                    # Reset game after completion
+                    player_flight = Flight(screen_width // 4, screen_height // 2, 0.3, 5, 5, is_enemy=False)
+                    enemy_flights = []
+                    game_over = False
+                    game_completed = False
+                    score = 0
+                    level_manager = LevelManager()
+                    bg_manager = BackgroundManager()
+                    spawn_enemy(enemy_flights, player_flight.world_x, 800, level_manager.current_level)
+
+        # Get keyboard input regardless of transition state
+        keys = pygame.key.get_pressed()
+        moves_up = keys[pygame.K_UP]
+        moves_down = keys[pygame.K_DOWN]
+        speed_up = keys[pygame.K_RIGHT]
+        speed_down = keys[pygame.K_LEFT]
+
+        if not game_over and not game_completed:
+            # Always play sound and allow movement, even during level transition
+            player_flight.play_sound(is_enemy=False)
+            player_flight.flight_movement(moves_up, moves_down, speed_up, speed_down)
+
+            # Update camera (follow player horizontally)
+            target_x = player_flight.world_x - screen_width // 4
+            camera_offset_x = target_x
+
+        # Update weather effects
+        bg_manager.update_weather()
+
+        # Update level and background
+        current_level = level_manager.update(player_flight.distance_traveled)
+        bg_manager.set_background_for_level(current_level)
+
+        # Only spawn enemies and handle enemy-related logic when not in transition
+        if not level_manager.show_transition and not game_over and not game_completed:
+            # Enemy spawning with level-based timing
+            spawn_timer += 1
+            spawn_cooldown_for_level = max(30, 120 - current_level * 30)  # Spawn faster in higher levels
+
+            if spawn_timer >= spawn_cooldown_for_level:
+                spawn_enemy(enemy_flights, player_flight.world_x, 800, current_level)
+                spawn_timer = 0
+
+            # Remove enemies that are too far behind (do this even during transition)
+            for enemy in enemy_flights[:]:
+                if player_flight.world_x - enemy.world_x > screen_width:
+                    enemy_flights.remove(enemy)
+
+            # Always update player collision data
+            player_flight.update_collision_data()
+
+            # Only handle enemy movement and collisions when not in transition
+            if not level_manager.show_transition:
+                for enemy in enemy_flights:
+                    enemy.enemy_movement(player_flight, current_level)
+                    enemy.update_collision_data()
+
+                # Check collisions - damage increases with level
+                if check_collisions(player_flight, enemy_flights):
+                    if player_flight.current_health <= 0:
+                        game_over = True
+                        audio.stop_loop("engine")
+                    else:
+                        current_time = pygame.time.get_ticks()
+                        if current_time - player_flight.last_hit_time < 200:
+                            flash_surface = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+                            flash_surface.fill((255, 0, 0, 50))
+                            screen.blit(flash_surface, (0, 0))
+
+            # Update score based on distance traveled
+            score = int(player_flight.distance_traveled / 10)
+
+            # Check if game is completed (passed all levels)
+            if score >= 26000:
+                game_completed = True
+                audio.stop_loop("engine")
+
+        # Drawing
+        bg_manager.draw(camera_offset_x)
+
+        for enemy in enemy_flights:
+            enemy.draw(camera_offset_x)
+
+        player_flight.draw(camera_offset_x)
+
+        # UI Elements
+        player_flight.draw_health_bar(screen, 10, 50, player_flight.current_health, player_flight.max_health)
+        health_text = text_cache.render(f"{player_flight.current_health}/{player_flight.max_health}", (255, 255, 255))
+        screen.blit(health_text, (220, 50))
+
+        score_text = text_cache.render(f"Distance: {score}km", (255, 255, 255))
+        screen.blit(score_text, (10, 10))
+
+        # Draw level information with season and location
+        level_info = text_cache.render(
+            f"Level: {current_level} | {bg_manager.current_season.capitalize()} | {bg_manager.current_location.replace('_', ' ').title()}",
+            (255, 255, 255))
+        screen.blit(level_info, (screen_width - 450, 10))
+
+        level_manager.draw_level_info(screen)
+
+        if game_over:
+            # Create a semi-transparent overlay
+            overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 128))
+            screen.blit(overlay, (0, 0))
+
+            game_over_text = text_cache.render("GAME OVER! Press R to restart", (255, 0, 0))
+            text_rect = game_over_text.get_rect(center=(screen_width // 2, screen_height // 2))
+            screen.blit(game_over_text, text_rect)
+
+        if game_completed:
+            # Create a semi-transparent overlay
+            overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 128))
+            screen.blit(overlay, (0, 0))
+
+            complete_text = text_cache.render("CONGRATULATIONS!", (0, 255, 0), 72)
+            text_rect = complete_text.get_rect(center=(screen_width // 2, screen_height // 2 - 50))
+            screen.blit(complete_text, text_rect)
+
+            stats_text = text_cache.render(
+                f"You completed all {level_manager.max_level} levels with a distance of {score}km!", (255, 255, 255))
+            stats_rect = stats_text.get_rect(center=(screen_width // 2, screen_height // 2 + 20))
+            screen.blit(stats_text, stats_rect)
+
+            restart_text = text_cache.render("Press R to play again", (255, 255, 255))
+            restart_rect = restart_text.get_rect(center=(screen_width // 2, screen_height // 2 + 70))
+            screen.blit(restart_text, restart_rect)
+
+        pygame.display.flip()
+        clock.tick(60)
+
+
+def main():
+    init()
+    run()
+    pygame.quit()
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()
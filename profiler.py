@@ -0,0 +1,160 @@
+import json
+import time
+from collections import deque
+
+import pygame
+
+
+class FrameProfiler:
+    """Times the phases of each frame.
+
+    A frame starts with begin_frame(); every mark(name) closes the phase that
+    ran since the previous mark. Rolling samples feed the on-screen overlay and
+    percentile reports, and with tracing on every phase is also kept as a
+    Chrome trace event (open the saved file in chrome://tracing or Perfetto).
+    Counters track settings that change at run time next to the timings.
+    While disabled, every call returns straight away.
+    """
+
+    def __init__(self, window=240):
+        self.enabled = False
+        self.overlay = False
+        self.window = window
+        self.samples = {}
+        self.counters = {}
+        self.trace = None
+        self.frame_start = 0.0
+        self.last = 0.0
+        self.overlay_panel = None
+        self.overlay_age = 0
+
+    def start(self, overlay=False, trace=False):
+        self.enabled = True
+        self.overlay = overlay
+        if trace and self.trace is None:
+            self.trace = []
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        self.enabled = self.overlay or self.trace is not None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last = time.perf_counter()
+
+    def mark(self, name):
+        """Close the phase that ran since the last mark"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.record(name, self.last, now)
+        self.last = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.record("frame", self.frame_start, self.last)
+
+    def counter(self, name, value):
+        """Record the current value of a setting, traced whenever it changes"""
+        if not self.enabled or self.counters.get(name) == value:
+            return
+        self.counters[name] = value
+        if self.trace is not None:
+            # Chrome trace counters must be numbers, so names become labels of a constant
+            args = {str(value): 1} if isinstance(value, str) else {name: value}
+            self.trace.append({"name": name, "ph": "C", "pid": 1, "tid": 1,
+                               "ts": time.perf_counter() * 1e6, "args": args})
+
+    def record(self, name, start, end):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(end - start)
+        if self.trace is not None:
+            self.trace.append({"name": name, "ph": "X", "pid": 1, "tid": 1,
+                               "ts": start * 1e6, "dur": (end - start) * 1e6})
+
+    def percentiles(self, name, points=(50, 95, 99)):
+        """Rolling percentiles of a phase, in milliseconds"""
+        ordered = sorted(self.samples.get(name, ()))
+        if not ordered:
+            return [0.0 for _ in points]
+        return [ordered[round(p / 100 * (len(ordered) - 1))] * 1000 for p in points]
+
+    def report(self):
+        """One line per phase with its rolling p50, p95 and p99 in milliseconds"""
+        lines = [f"{'phase':<18}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        # Phases in the order they first ran, then the whole frame
+        names = [name for name in self.samples if name != "frame"] + ["frame"]
+        for name in names:
+            p50, p95, p99 = self.percentiles(name)
+            lines.append(f"{name:<18}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+        for name, value in self.counters.items():
+            lines.append(f"{name:<18}{value!s:>7}")
+        return lines
+
+    def draw_overlay(self, surface, font, position=(10, 90), refresh=15):
+        """Draw the report, re-rendering it every refresh frames"""
+        if not self.overlay:
+            return
+        self.overlay_age -= 1
+        if self.overlay_panel is None or self.overlay_age <= 0:
+            lines = [font.render(line, True, (255, 255, 0)) for line in self.report()]
+            width = max(line.get_width() for line in lines)
+            height = sum(line.get_height() for line in lines)
+            self.overlay_panel = pygame.Surface((width + 10, height + 10), pygame.SRCALPHA)
+            self.overlay_panel.fill((0, 0, 0, 160))
+            y = 5
+            for line in lines:
+                self.overlay_panel.blit(line, (5, y))
+                y += line.get_height()
+            self.overlay_age = refresh
+        surface.blit(self.overlay_panel, (position[0] - 5, position[1] - 5))
+
+    def save_trace(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace or [], "displayTimeUnit": "ms"}, f)
+
+
+class FrameBudget:
+    """Judges a rolling window of frame times against a time budget.
+
+    judge() answers once a window is full: -1 when the frames took longer
+    than the budget on average, 1 when they fit within headroom times it,
+    and 0 otherwise. The window starts over after every verdict but 0, so
+    whatever the caller changes gets a full window before the next one;
+    with the gap between the two thresholds, that keeps adaptive settings
+    from flipping back and forth.
+    """
+
+    def __init__(self, budget=1 / 60, sample_frames=30, headroom=0.75):
+        self.budget = budget
+        self.headroom = headroom
+        self.frame_times = deque(maxlen=sample_frames)
+
+    def add(self, frame_time):
+        self.frame_times.append(frame_time)
+
+    def average(self):
+        return sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0.0
+
+    def full(self):
+        return len(self.frame_times) == self.frame_times.maxlen
+
+    def clear(self):
+        self.frame_times.clear()
+
+    def judge(self):
+        if not self.full():
+            return 0
+        average = self.average()
+        if average > self.budget:
+            verdict = -1
+        elif average < self.budget * self.headroom:
+            verdict = 1
+        else:
+            return 0
+        self.clear()
+        return verdict
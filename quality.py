@@ -0,0 +1,76 @@
+from profiler import FrameBudget
+
+
+class QualityTier:
+    """How much scenery and weather detail to draw.
+
+    particles and stars are fractions of the full raindrop and star counts;
+    clouds is the (min, max) number of clouds per sky tile.
+    """
+
+    def __init__(self, name, particles, stars, clouds, crop_rows, window_rows, tree_spacing):
+        self.name = name
+        self.particles = particles
+        self.stars = stars
+        self.clouds = clouds
+        self.crop_rows = crop_rows
+        self.window_rows = window_rows
+        self.tree_spacing = tree_spacing
+
+
+# From the game's full detail down to the least it can get away with
+TIERS = (
+    QualityTier("high", particles=1.0, stars=1.0, clouds=(2, 3), crop_rows=10, window_rows=5, tree_spacing=150),
+    QualityTier("medium", particles=0.6, stars=0.6, clouds=(1, 2), crop_rows=5, window_rows=3, tree_spacing=300),
+    QualityTier("low", particles=0.3, stars=0.3, clouds=(1, 1), crop_rows=0, window_rows=0, tree_spacing=600)
+)
+
+
+class QualityGovernor:
+    """Steps through the quality tiers to keep frames within budget.
+
+    It watches a rolling window of frame times, drops a tier after a window
+    over budget and climbs back after a window with plenty to spare. Its
+    windows are longer than the render resolution's, so the two don't react
+    to the same slow patch at once. With adaptive off it holds its tier.
+    """
+
+    def __init__(self, tiers=TIERS, index=0, adaptive=False, budget=1 / 60, sample_frames=90, headroom=0.6):
+        self.tiers = tiers
+        self.index = index
+        self.adaptive = adaptive
+        self.frame_budget = FrameBudget(budget, sample_frames, headroom)
+        self.changes = 0
+
+    @property
+    def tier(self):
+        return self.tiers[self.index]
+
+    def set_tier(self, name):
+        for index, tier in enumerate(self.tiers):
+            if tier.name == name:
+                if index != self.index:
+                    self.index = index
+                    self.changes += 1
+                return
+        raise ValueError(f"Unknown quality tier: {name}")
+
+    def adapt(self, frame_time):
+        """Record a frame's time, and step the tier after a slow or fast window"""
+        if not self.adaptive:
+            return
+        self.frame_budget.add(frame_time)
+        verdict = self.frame_budget.judge()
+        # Higher tiers come first, so a slow window means a higher index
+        index = min(len(self.tiers) - 1, max(0, self.index - verdict))
+        if index != self.index:
+            self.index = index
+            self.changes += 1
+
+    def telemetry(self):
+        return {
+            "tier": self.tier.name,
+            "tier_index": self.index,
+            "tier_changes": self.changes,
+            "frame_ms": self.frame_budget.average() * 1000
+        }
@@ -0,0 +1,158 @@
+import pygame
+from collections import OrderedDict
+
+
+def to_display_format(surface, alpha=False):
+    """Convert a surface to the display's pixel format when a display exists"""
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return surface.convert_alpha() if alpha else surface.convert()
+    return surface
+
+
+class LayerCache:
+    """Keeps pre-rendered full-screen layers, keyed by anything hashable.
+
+    Only the most recently used layers are kept, so memory stays flat no matter
+    how many environments the game cycles through.
+    """
+
+    def __init__(self, size, capacity=4):
+        self.size = size
+        self.capacity = capacity
+        self.layers = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        """Return the layer for key, calling render(surface) to build it on a miss"""
+        layer = self.layers.get(key)
+        if layer is not None:
+            self.layers.move_to_end(key)
+            self.hits += 1
+            return layer
+
+        self.misses += 1
+        layer = to_display_format(pygame.Surface(self.size))
+        render(layer)
+        self.layers[key] = layer
+        if len(self.layers) > self.capacity:
+            self.layers.popitem(last=False)
+        return layer
+
+    def clear(self):
+        self.layers.clear()
+
+
+class SurfacePool:
+    """Shared pool of small solid-color surfaces, keyed by (size, color, alpha).
+
+    Renderers ask the pool for a surface instead of creating and filling a new
+    one for every primitive.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.allocations = 0
+        self.frame_allocations = 0
+        self.last_frame_allocations = 0
+
+    def get(self, size, color, alpha=255):
+        """Return a surface of the given size filled with color at alpha"""
+        key = (size, color[:3], alpha)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        surface.fill((color[0], color[1], color[2], alpha))
+
+        self.allocations += 1
+        self.frame_allocations += 1
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def begin_frame(self):
+        """Start counting allocations for a new frame"""
+        self.last_frame_allocations = self.frame_allocations
+        self.frame_allocations = 0
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+class FontRegistry:
+    """Loads each (name, size) font once and shares it with every renderer"""
+
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, size, name=None):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            # The font module starts with the first font anyone asks for
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self.fonts[key] = pygame.font.SysFont(name, size)
+        return font
+
+
+class TextCache:
+    """Rendered text surfaces, keyed by font, text and color.
+
+    Text is only rasterised again when it changes. Only the most recently
+    used surfaces are kept, so counters like the distance don't pile up.
+    """
+
+    def __init__(self, fonts, capacity=128):
+        self.fonts = fonts
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, color, size=36, name=None):
+        """Return text rendered antialiased in the given font"""
+        key = (name, size, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = to_display_format(self.fonts.get(size, name).render(text, True, color), alpha=True)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+class RenderQueue:
+    """Blits collected over a frame and submitted one layer at a time.
+
+    Each layer goes to the surface in a single Surface.blits call, in the
+    order the layers were named, so a whole layer costs one call from Python
+    however many sprites it holds. Within a layer, blits keep the order they
+    were added in, which decides what is drawn on top where sprites overlap.
+    """
+
+    def __init__(self, layers):
+        self.layers = {name: [] for name in layers}
+
+    def add(self, layer, image, position, area=None):
+        self.layers[layer].append((image, position) if area is None else (image, position, area))
+
+    def flush(self, surface):
+        """Draw every queued blit onto surface and empty the queue"""
+        for blits in self.layers.values():
+            if blits:
+                surface.blits(blits, doreturn=False)
+                blits.clear()
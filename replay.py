@@ -0,0 +1,178 @@
+"""Compact recordings of the player input that drives a game session.
+
+A recording is a list of segments, one per game played (every restart
+starts a new segment). A segment holds the session seed, the input for
+every frame as run-length encoded 4-bit fields and the outcome it reached,
+which lets a replay check that it reproduced the session exactly.
+
+File layout, all integers little-endian or LEB128 varints:
+
+    b"FLRP", version byte, flags byte, segment count
+    per segment: seed (zigzag varint), run count, runs of (bits byte, length),
+                 final distance (zigzag varint), final health (zigzag varint)
+
+Version 1 recordings, which stored the seed as a signed 64-bit integer,
+still load.
+"""
+import struct
+
+MAGIC = b"FLRP"
+VERSION = 2
+
+# Recording flags
+NUMPY_ENEMIES = 1
+
+# One bit per gameplay input
+MOVES_UP = 1
+MOVES_DOWN = 2
+SPEED_UP = 4
+SPEED_DOWN = 8
+
+
+class ReplayError(Exception):
+    pass
+
+
+def pack_input(moves_up, moves_down, speed_up, speed_down):
+    return ((MOVES_UP if moves_up else 0) | (MOVES_DOWN if moves_down else 0) |
+            (SPEED_UP if speed_up else 0) | (SPEED_DOWN if speed_down else 0))
+
+
+def unpack_input(bits):
+    return bool(bits & MOVES_UP), bool(bits & MOVES_DOWN), bool(bits & SPEED_UP), bool(bits & SPEED_DOWN)
+
+
+def write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError("Recording is truncated")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value):
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+class Segment:
+    """The input for one game, from (re)start to restart or quit"""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.runs = []
+        self.outcome = None  # (distance, health) once finished
+
+    def __len__(self):
+        return sum(length for _, length in self.runs)
+
+    def record(self, bits):
+        if self.runs and self.runs[-1][0] == bits:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([bits, 1])
+
+    def inputs(self):
+        """Yield the (moves_up, moves_down, speed_up, speed_down) input for every frame"""
+        for bits, length in self.runs:
+            frame_input = unpack_input(bits)
+            for _ in range(length):
+                yield frame_input
+
+
+class Recording:
+    def __init__(self, flags=0):
+        self.flags = flags
+        self.segments = []
+
+    def start(self, seed):
+        """Begin a new segment for a game started from seed"""
+        self.segments.append(Segment(seed))
+
+    def record(self, moves_up, moves_down, speed_up, speed_down):
+        self.segments[-1].record(pack_input(moves_up, moves_down, speed_up, speed_down))
+
+    def finish(self, distance, health):
+        """Store the outcome the current segment reached"""
+        if self.segments and self.segments[-1].outcome is None:
+            self.segments[-1].outcome = (distance, health)
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        out.append(self.flags)
+        write_varint(out, len(self.segments))
+        for segment in self.segments:
+            write_varint(out, zigzag(segment.seed))
+            write_varint(out, len(segment.runs))
+            for bits, length in segment.runs:
+                out.append(bits)
+                write_varint(out, length)
+            distance, health = segment.outcome or (0, 0)
+            write_varint(out, zigzag(distance))
+            write_varint(out, zigzag(health))
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC:
+            raise ReplayError("Not a flight recording")
+        if len(data) < 6:
+            raise ReplayError("Recording is truncated")
+        version = data[4]
+        if version not in (1, VERSION):
+            raise ReplayError(f"Unsupported recording version {version}")
+
+        recording = cls(flags=data[5])
+        count, pos = read_varint(data, 6)
+        for _ in range(count):
+            if version == 1:
+                if pos + 8 > len(data):
+                    raise ReplayError("Recording is truncated")
+                seed = struct.unpack_from("<q", data, pos)[0]
+                pos += 8
+            else:
+                seed, pos = read_varint(data, pos)
+                seed = unzigzag(seed)
+            segment = Segment(seed)
+            run_count, pos = read_varint(data, pos)
+            for _ in range(run_count):
+                if pos >= len(data):
+                    raise ReplayError("Recording is truncated")
+                bits = data[pos]
+                length, pos = read_varint(data, pos + 1)
+                segment.runs.append([bits, length])
+            distance, pos = read_varint(data, pos)
+            health, pos = read_varint(data, pos)
+            segment.outcome = (unzigzag(distance), unzigzag(health))
+            recording.segments.append(segment)
+        return recording
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
@@ -0,0 +1,102 @@
+import pygame
+
+from profiler import FrameBudget
+from render_cache import to_display_format
+
+
+class RenderResolution:
+    """The resolution the world is drawn at, before it is scaled to the window.
+
+    The game lays everything out in logical pixels. The world is drawn onto
+    an internal frame scale times that size, which present() stretches over
+    the window; at scale 1 the frame is the window itself and costs nothing
+    extra. Only scales in SCALES are used: a whole-number stretch is the
+    only one that is cheap in software, while at 0.75 the stretch alone
+    costs more than drawing the full-size frame saves.
+
+    In adaptive mode, adapt() moves to the next lower scale while frames
+    take longer than the budget, and back up once they fit comfortably.
+    Every move is tried for one window. Drawing fewer pixels doesn't always
+    pay for the stretch, since most scenery is cheaper to draw at full size,
+    so a step down is only kept if frames get at least a tenth faster; a
+    step up is only kept if they stay within budget. A move that fails is
+    undone, and moves that way are held off for hold_frames.
+    """
+
+    # From full resolution down, each a whole-number stretch of the frame
+    SCALES = (1.0, 0.5)
+
+    def __init__(self, logical_size, scale=1.0, adaptive=False, budget=1 / 60, sample_frames=30, headroom=0.75,
+                 hold_frames=600):
+        self.logical_size = logical_size
+        self.adaptive = adaptive
+        self.frame_budget = FrameBudget(budget, sample_frames, headroom)
+        self.hold_frames = hold_frames
+        self.held = {}  # direction: frames left before moving that way again
+        self.trial = None  # (previous scale, its average frame time, direction) of an unproven move
+        self.frame = None
+        self.window = None
+        self.scale = self.snap(scale)
+        self.changes = 0
+
+    def snap(self, scale):
+        """Return the supported scale nearest to scale"""
+        return min(self.SCALES, key=lambda supported: abs(supported - scale))
+
+    def size(self):
+        return (round(self.logical_size[0] * self.scale), round(self.logical_size[1] * self.scale))
+
+    def begin(self, window):
+        """Return the surface to draw the world on this frame"""
+        if self.scale == 1.0 and window.get_size() == tuple(self.logical_size):
+            return window
+        if self.frame is None or self.frame.get_size() != self.size():
+            self.frame = to_display_format(pygame.Surface(self.size()))
+        return self.frame
+
+    def present(self, frame, window):
+        """Stretch the world frame over the window"""
+        if frame is not window:
+            pygame.transform.scale(frame, window.get_size(), window)
+
+    def set_scale(self, scale):
+        scale = self.snap(scale)
+        if scale != self.scale:
+            self.scale = scale
+            self.changes += 1
+
+    def adapt(self, frame_time):
+        """Step the resolution down or up after a window of slow or fast frames"""
+        if not self.adaptive:
+            return
+        budget = self.frame_budget
+        budget.add(frame_time)
+        for direction, frames in list(self.held.items()):
+            if frames > 1:
+                self.held[direction] = frames - 1
+            else:
+                del self.held[direction]
+
+        if self.trial is not None:
+            # A move gets one full window to show it was worth it
+            if not budget.full():
+                return
+            scale, before, direction = self.trial
+            self.trial = None
+            average = budget.average()
+            failed = average > before * 0.9 if direction < 0 else average > budget.budget
+            if failed:
+                self.set_scale(scale)
+                self.held[direction] = self.hold_frames
+            budget.clear()
+            return
+
+        average = budget.average()
+        verdict = budget.judge()
+        if not verdict or verdict in self.held:
+            return
+        # Higher scales come first, so a slow window means a higher index
+        index = self.SCALES.index(self.scale) - verdict
+        if 0 <= index < len(self.SCALES):
+            self.trial = (self.scale, average, verdict)
+            self.set_scale(self.SCALES[index])
@@ -0,0 +1,49 @@
+import hashlib
+import random
+
+import numpy as np
+
+# Each subsystem draws from its own stream, so for example extra visual
+# effects never change where enemies spawn or how they fly
+SUBSYSTEMS = ("world", "spawning", "enemy_ai", "effects")
+
+
+def new_seed():
+    """Pick a fresh session seed"""
+    return random.SystemRandom().randrange(2 ** 32)
+
+
+def derive_seed(seed, name):
+    """Derive a stable per-stream seed from a session seed and a stream name"""
+    digest = hashlib.sha256(f"{seed}:{name}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def index_hash(seed, index):
+    """Cheap stable 64-bit hash of an integer index, for features laid out along the world"""
+    x = (seed * 0x9E3779B97F4A7C15 + index) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return x ^ (x >> 31)
+
+
+class RandomStreams:
+    """Per-subsystem random.Random streams derived from one session seed.
+
+    The streams are reseeded in place, so code holding on to one keeps
+    drawing from the current session.
+    """
+
+    def __init__(self, seed=None):
+        for name in SUBSYSTEMS:
+            setattr(self, name, random.Random())
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        self.seed = new_seed() if seed is None else seed
+        for name in SUBSYSTEMS:
+            getattr(self, name).seed(derive_seed(self.seed, name))
+
+    def numpy(self, name, label):
+        """Return a NumPy generator for a subsystem, distinct for every label"""
+        return np.random.default_rng(derive_seed(self.seed, f"{name}:{label}"))
@@ -0,0 +1,71 @@
+import random
+
+import pygame
+
+from render_cache import to_display_format
+from rng import derive_seed, index_hash
+
+
+class Skyline:
+    """An endless city skyline built from a fixed set of building variants.
+
+    Every building slot along the world gets its variant from a hash of its
+    tile index, so the skyline holds still while it scrolls and is the same
+    for the same seed. The variants are baked once per lighting into an
+    atlas, and every building is a single blit out of it.
+    """
+    building_width = 120
+    spacing = 150
+    min_height = 100
+    max_height = 250
+    wall_color = (100, 100, 100)
+    unlit_color = (50, 50, 50)
+    lit_colors = {
+        "day": (200, 200, 200),
+        "night": (255, 255, 0)
+    }
+
+    def __init__(self, seed, variants=16):
+        self.seed = seed
+        rng = random.Random(derive_seed(seed, "skyline"))
+        self.heights = [rng.randint(self.min_height, self.max_height) for _ in range(variants)]
+        # 5 rows of 3 windows; some windows are lit
+        self.windows = [[rng.random() > 0.3 for _ in range(15)] for _ in range(variants)]
+        self.atlases = {}
+
+    def atlas(self, lighting, window_rows=5):
+        key = (lighting, window_rows)
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            atlas = self.atlases[key] = self.bake(lighting, window_rows)
+        return atlas
+
+    def bake(self, lighting, window_rows=5):
+        """Render every variant side by side, standing on the bottom edge, with the top window_rows of windows"""
+        atlas = pygame.Surface((self.building_width * len(self.heights), self.max_height))
+        lit_color = self.lit_colors[lighting]
+        for i, (height, windows) in enumerate(zip(self.heights, self.windows)):
+            left = i * self.building_width
+            top = self.max_height - height
+            atlas.fill(self.wall_color, (left, top, self.building_width, height))
+            for y in range(window_rows):
+                for x in range(3):
+                    color = lit_color if windows[y * 3 + x] else self.unlit_color
+                    atlas.fill(color, (left + 20 + x * 30, top + 20 + y * 40, 20, 30))
+        return to_display_format(atlas)
+
+    def variant(self, tile):
+        return index_hash(self.seed, tile) % len(self.heights)
+
+    def draw(self, surface, camera_offset, ground_y, lighting="day", window_rows=5):
+        atlas = self.atlas(lighting, window_rows)
+
+        first = int(camera_offset // self.spacing)
+        count = surface.get_width() // self.spacing + 2
+        blits = []
+        for tile in range(first, first + count):
+            variant = self.variant(tile)
+            height = self.heights[variant]
+            area = (variant * self.building_width, self.max_height - height, self.building_width, height)
+            blits.append((atlas, (tile * self.spacing - camera_offset, ground_y - height), area))
+        surface.blits(blits, doreturn=False)
@@ -0,0 +1,112 @@
+"""Difficulty parameter sweeps over many simulated sessions.
+
+Every point of the parameter grid is played by a scripted pilot for a
+number of seeded headless sessions, spread across a process pool:
+
+    python sweep.py --grid spawn_cooldown_step=20,30,40 --grid level_spacing=800,1000 \
+        --sessions 50 --workers 16 --csv sweep.csv
+"""
+import argparse
+import csv
+import itertools
+import os
+import statistics
+import sys
+from multiprocessing import Pool
+
+from autopilot import POLICIES
+from difficulty import Difficulty
+
+pilots = None
+
+
+def init_worker():
+    """Import the simulation in a worker process; it never opens a window or the mixer"""
+    global pilots
+    import pilots
+
+
+def run_point(task):
+    """Play every session for one grid point and aggregate the results"""
+    params, policy_name, sessions, max_frames, seed = task
+    difficulty = Difficulty(**params)
+    results, fps = pilots.run_headless(pilots.POLICIES[policy_name], max_frames, sessions, seed=seed,
+                                       difficulty=difficulty)
+
+    distances = [result["distance"] for result in results]
+    return {
+        **params,
+        "sessions": len(results),
+        "mean_distance": statistics.fmean(distances),
+        "median_distance": float(statistics.median(distances)),
+        "mean_hits_taken": statistics.fmean(result["hits_taken"] for result in results),
+        "completion_rate": sum(result["completed"] for result in results) / len(results),
+        "sim_fps": round(fps)
+    }
+
+
+def parse_grid(specs):
+    """Turn ["name=1,2,3", ...] into {name: [1, 2, 3], ...}"""
+    names = Difficulty.parameter_names()
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in names:
+            raise ValueError(f"Unknown parameter {name!r}, expected one of: {', '.join(names)}")
+        grid[name] = [float(v) if "." in v else int(v) for v in values.split(",") if v]
+    return grid
+
+
+def grid_points(grid):
+    names = list(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def print_table(rows):
+    if not rows:
+        return
+    columns = list(rows[0])
+    cells = [[f"{row[c]:.3f}" if isinstance(row[c], float) else str(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.rjust(w) for c, w in zip(columns, widths)))
+    for r in cells:
+        print("  ".join(v.rjust(w) for v, w in zip(r, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep difficulty parameters over simulated sessions")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="parameter values to sweep (repeatable)")
+    parser.add_argument("--sessions", type=int, default=20, help="sessions per grid point")
+    parser.add_argument("--frames", type=int, default=60 * 60 * 10, help="frame limit per session")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="dodge", help="scripted pilot")
+    parser.add_argument("--seed", type=int, default=0, help="first session seed at every grid point")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--csv", metavar="FILE", help="also write the results table to FILE")
+    args = parser.parse_args()
+
+    try:
+        grid = parse_grid(args.grid)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Every grid point uses the same seeds, so points differ only in their parameters
+    tasks = [(params, args.policy, args.sessions, args.frames, args.seed) for params in grid_points(grid)]
+    pool = Pool(args.workers, initializer=init_worker)
+    try:
+        rows = pool.map(run_point, tasks, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    print_table(rows)
+    if args.csv and rows:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import numpy as np
+import pygame
+
+
+class ParticleField:
+    """Particles held in NumPy arrays and drawn with a single Surface.blits call.
+
+    Sprites are given as a list of (image, (dx, dy)) pairs. Each particle picks
+    one through its entry in self.sprite and is drawn at its position shifted by
+    (dx, dy).
+    """
+
+    def __init__(self, count, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.x = np.zeros(count)
+        self.y = np.zeros(count)
+        self.sprite = np.zeros(count, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.x)
+
+    def scatter(self, width, y_min, y_max):
+        """Place every particle at a random position"""
+        count = len(self.x)
+        self.x[:] = self.rng.integers(0, width + 1, count)
+        self.y[:] = self.rng.integers(y_min, y_max + 1, count)
+
+    def draw(self, surface, sprites, offset_x=0, wrap_width=None, scale=1.0, limit=None):
+        """Blit every particle onto surface in one call, grouped by sprite.
+
+        scale maps particle positions onto a surface that is drawn smaller
+        or larger than the field; the sprites are expected at that scale.
+        With a limit, only the first limit particles are drawn, while the
+        rest keep moving unseen.
+        """
+        count = len(self.x) if limit is None else min(limit, len(self.x))
+        if not count:
+            return
+
+        xs = self.x[:count] - offset_x
+        if wrap_width:
+            xs %= wrap_width
+        ys = self.y[:count]
+        if scale != 1.0:
+            xs = xs * scale
+            ys = ys * scale
+
+        shifts = np.array([shift for _, shift in sprites], dtype=np.float64)
+        order = np.argsort(self.sprite[:count], kind="stable")
+        index = self.sprite[order]
+        xs = (xs[order] + shifts[index, 0]).tolist()
+        ys = (ys[order] + shifts[index, 1]).tolist()
+        images = [image for image, _ in sprites]
+
+        surface.blits([(images[i], (x, y)) for i, x, y in zip(index.tolist(), xs, ys)], doreturn=False)
+
+
+class RainParticles(ParticleField):
+    """Falling raindrops that respawn at the top once they leave the screen.
+
+    With steady=True each drop keeps the speed it was given at spawn, otherwise
+    a fresh speed is rolled for every drop on every update.
+    """
+
+    def __init__(self, count, width, height, rng=None, spawn_y=None, respawn_y=(0, 0), speed=(5, 15),
+                 steady=False):
+        super().__init__(count, rng)
+        self.width = width
+        self.height = height
+        self.respawn_y = respawn_y
+        self.speed_range = speed
+        self.steady = steady
+
+        spawn_y = spawn_y or (0, height)
+        self.scatter(width, spawn_y[0], spawn_y[1])
+        self.speed = self.rng.uniform(speed[0], speed[1], count)
+
+    def update(self):
+        if self.steady:
+            self.y += self.speed
+        else:
+            self.y += self.rng.integers(self.speed_range[0], self.speed_range[1] + 1, len(self.y))
+
+        # Reset fallen drops at the top
+        fallen = self.y > self.height
+        count = int(np.count_nonzero(fallen))
+        if count:
+            self.x[fallen] = self.rng.integers(0, self.width + 1, count)
+            self.y[fallen] = self.rng.integers(self.respawn_y[0], self.respawn_y[1] + 1, count)
+
+
+class StarParticles(ParticleField):
+    """Twinkling stars of varying size and brightness.
+
+    Brightness is quantised into shade_levels steps so that every star maps to
+    one of the pre-rendered sprites from star_sprites().
+    """
+
+    shade_levels = 16
+
+    def __init__(self, count, width, height, rng=None, size=(1, 3), brightness=(150, 255)):
+        super().__init__(count, rng)
+        self.scatter(width, 0, height)
+        self.size = self.rng.integers(size[0], size[1] + 1, count)
+        self.brightness = self.rng.integers(brightness[0], brightness[1] + 1, count)
+        self.update_sprites()
+
+    def twinkle(self):
+        """Randomly adjust every star's brightness"""
+        self.brightness += self.rng.integers(-20, 21, len(self.brightness))
+        np.clip(self.brightness, 100, 255, out=self.brightness)
+        self.update_sprites()
+
+    def update_sprites(self):
+        self.sprite[:] = (self.size - 1) * self.shade_levels + self.brightness * self.shade_levels // 256
+
+    @classmethod
+    def star_sprites(cls, max_size=3):
+        """Pre-render one circle per (size, shade), centred on the star position"""
+        sprites = []
+        for size in range(1, max_size + 1):
+            for shade in range(cls.shade_levels):
+                value = min(255, shade * 256 // cls.shade_levels + 8)
+                image = pygame.Surface((size * 2 + 1, size * 2 + 1), pygame.SRCALPHA)
+                pygame.draw.circle(image, (value, value, value), (size, size), size)
+                sprites.append((image, (-size, -size)))
+        return sprites
+
+
+def rain_streak_sprites(speed=(5, 15), color=(200, 200, 255)):
+    """Pre-render the slanted rain streak for every whole speed in the range"""
+    sprites = []
+    for s in range(speed[0], speed[1] + 1):
+        length = int(s * 0.5)
+        image = pygame.Surface((length + 1, length + 1), pygame.SRCALPHA)
+        pygame.draw.line(image, color, (length, 0), (0, length), 1)
+        sprites.append((image, (-length, 0)))
+    return sprites